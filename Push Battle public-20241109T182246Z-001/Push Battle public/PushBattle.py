@@ -1,3 +1,4 @@
+import random
 import numpy as np
 from typing import List
 
@@ -16,6 +17,36 @@ def _torus(r, c):
     ct = (c + BOARD_SIZE) % BOARD_SIZE
     return rt, ct
 
+def _build_windows():
+    """Returns every three-in-a-row window on the torus as a tuple of three cells."""
+    windows = []
+    for dr, dc in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+        for r in range(BOARD_SIZE):
+            for c in range(BOARD_SIZE):
+                windows.append(tuple(_torus(r + i * dr, c + i * dc) for i in range(3)))
+    return windows
+
+WINDOWS = _build_windows()  # All 256 three-in-a-row windows (rows, cols, negative and positive diagonals)
+
+# CELL_WINDOWS[r][c] lists the indices of the 12 windows that pass through (r, c)
+CELL_WINDOWS = [[[] for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+for _i, _window in enumerate(WINDOWS):
+    for _r, _c in _window:
+        CELL_WINDOWS[_r][_c].append(_i)
+
+# Maps the torus offset between a push origin and a pushed piece's landing cell to the step back towards the origin
+_PUSH_STEP = {0: 0, 2: 1, BOARD_SIZE - 2: -1}
+
+# Zobrist keys, drawn from a fixed seed so position hashes are stable across processes and saved files
+_zobrist_rng = random.Random(20241109)
+ZOBRIST_PIECES = {                                                              # ZOBRIST_PIECES[player][r * BOARD_SIZE + c]
+    PLAYER1: [_zobrist_rng.getrandbits(64) for _ in range(BOARD_SIZE * BOARD_SIZE)],
+    PLAYER2: [_zobrist_rng.getrandbits(64) for _ in range(BOARD_SIZE * BOARD_SIZE)],
+}
+ZOBRIST_SIDE = _zobrist_rng.getrandbits(64)                                     # Folded in when PLAYER2 is to move
+ZOBRIST_P1_COUNT = [_zobrist_rng.getrandbits(64) for _ in range(NUM_PIECES + 1)] # Indexed by p1_pieces
+ZOBRIST_P2_COUNT = [_zobrist_rng.getrandbits(64) for _ in range(NUM_PIECES + 1)] # Indexed by p2_pieces
+
 def array_to_chess_notation(move: List[int]) -> str:
     """
     Convert array coordinates (0-7, 0-7) to chess notation (a1-h8).
@@ -43,6 +74,7 @@ class Game:
         self.turn_count = 0                                 # Number of turns elapsed in the game
         self.p1_pieces = 0                                  # Number of pieces that Player1 has placed on the board
         self.p2_pieces = 0                                  # Number of pieces that Player2 has placed on the board
+        self.zobrist_board = 0                              # Zobrist hash of the pieces on the board, kept up to date by the move methods
 
     # Converts all variables of the game to a dictionary
     def to_dict(self):
@@ -63,8 +95,25 @@ class Game:
         game.turn_count = data["turn_count"]
         game.p1_pieces = data["p1_pieces"]
         game.p2_pieces = data["p2_pieces"]
+        game.rehash()
         return game
 
+    # 64-bit Zobrist key of the position: the board hash with the side to move and the piece counts folded in
+    @property
+    def zobrist_key(self):
+        key = self.zobrist_board ^ ZOBRIST_P1_COUNT[self.p1_pieces] ^ ZOBRIST_P2_COUNT[self.p2_pieces]
+        if self.current_player == PLAYER2:
+            key ^= ZOBRIST_SIDE
+        return key
+
+    # Recomputes the board hash from scratch; needed after writing to the board directly
+    def rehash(self):
+        self.zobrist_board = 0
+        for r in range(BOARD_SIZE):
+            for c in range(BOARD_SIZE):
+                if self.board[r][c] != EMPTY:
+                    self.zobrist_board ^= ZOBRIST_PIECES[self.board[r][c]][r * BOARD_SIZE + c]
+
     # Displays the board
     def display_board(self):
         tile_symbols = {
@@ -105,22 +154,28 @@ class Game:
         return True
      
     # Handles the PLACEMENT of the checker
+    # Returns the cells that became occupied (the placed cell and every pushed piece)
     def place_checker(self, r, c):
         self.board[r][c] = self.current_player
+        self.zobrist_board ^= ZOBRIST_PIECES[self.current_player][r * BOARD_SIZE + c]
         if self.current_player == PLAYER1:
             self.p1_pieces += 1
         else:
             self.p2_pieces += 1
-        self.push_neighbors(r, c)
+        return [(r, c)] + self.push_neighbors(r, c)
 
     # Handles the MOVEMENT of the checker
+    # Returns the cells that became occupied (the destination and every pushed piece)
     def move_checker(self, r0, c0, r1, c1):
         self.board[r0][c0] = EMPTY
         self.board[r1][c1] = self.current_player
-        self.push_neighbors(r1, c1)
+        self.zobrist_board ^= ZOBRIST_PIECES[self.current_player][r0 * BOARD_SIZE + c0] ^ ZOBRIST_PIECES[self.current_player][r1 * BOARD_SIZE + c1]
+        return [(r1, c1)] + self.push_neighbors(r1, c1)
 
     # Push mechanic - Pushes all pieces away
+    # Returns the cells the pushed pieces landed on
     def push_neighbors(self, r0, c0):
+        pushed = []
         dirs = [(-1, -1), (-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1)]
         for dr, dc in dirs:
             # (r1, c1) is a 1-tile (immediate) neighbor of (r0, c0) in the direction (dr, dc)
@@ -130,6 +185,10 @@ class Game:
                 r2, c2 = _torus(r1 + dr, c1 + dc)
                 if self.board[r2][c2] == EMPTY:
                     self.board[r2][c2], self.board[r1][c1] = self.board[r1][c1], self.board[r2][c2]
+                    keys = ZOBRIST_PIECES[self.board[r2][c2]]
+                    self.zobrist_board ^= keys[r1 * BOARD_SIZE + c1] ^ keys[r2 * BOARD_SIZE + c2]
+                    pushed.append((r2, c2))
+        return pushed
 
     # checks for a winner - 3 in a row
     def check_winner(self):
@@ -225,6 +284,74 @@ class Game:
 
         return EMPTY # no one has won the game
 
+    # checks for a winner using only the windows through the given cells
+    # cells - the cells returned by place_checker/move_checker; the position before that move must have had no winner
+    # mover - the player who made the move and wins if both players complete a line (defaults to current_player)
+    def check_winner_at(self, cells, mover=None):
+        if mover is None:
+            mover = self.current_player
+        player1_wins = False
+        player2_wins = False
+        for r, c in cells:
+            tile = self.board[r][c]
+            if tile == EMPTY or (tile == PLAYER1 and player1_wins) or (tile == PLAYER2 and player2_wins):
+                continue
+            for i in CELL_WINDOWS[r][c]:
+                (ra, ca), (rb, cb), (rc, cc) = WINDOWS[i]
+                if self.board[ra][ca] == tile and self.board[rb][cb] == tile and self.board[rc][cc] == tile:
+                    if tile == PLAYER1:
+                        player1_wins = True
+                    else:
+                        player2_wins = True
+                    break
+
+        if player1_wins and player2_wins:
+            return mover
+        elif player1_wins:
+            return PLAYER1
+        elif player2_wins:
+            return PLAYER2
+
+        return EMPTY # no one has won the game
+
+    # Plays a move [r, c] or [r0, c0, r1, c1] for the current player, then advances turn_count and current_player
+    # Returns an undo token for unmake_move: (move, occupied cells, mover, turn_count, p1_pieces, p2_pieces, zobrist_board)
+    def make_move(self, move):
+        mover = self.current_player
+        turn_count = self.turn_count
+        p1_pieces = self.p1_pieces
+        p2_pieces = self.p2_pieces
+        zobrist_board = self.zobrist_board
+        if len(move) == 2:
+            changed = self.place_checker(move[0], move[1])
+        else:
+            changed = self.move_checker(move[0], move[1], move[2], move[3])
+        self.turn_count += 1
+        self.current_player = PLAYER2 if mover == PLAYER1 else PLAYER1
+        return (move, changed, mover, turn_count, p1_pieces, p2_pieces, zobrist_board)
+
+    # Takes back the move that returned token; moves must be undone in reverse order
+    def unmake_move(self, token):
+        move, changed, mover, turn_count, p1_pieces, p2_pieces, zobrist_board = token
+        # pull every pushed piece back next to the origin of the push
+        r0, c0 = changed[0]
+        for r2, c2 in changed[1:]:
+            r1, c1 = _torus(r0 + _PUSH_STEP[(r2 - r0) % BOARD_SIZE], c0 + _PUSH_STEP[(c2 - c0) % BOARD_SIZE])
+            self.board[r1][c1] = self.board[r2][c2]
+            self.board[r2][c2] = EMPTY
+        self.board[r0][c0] = EMPTY
+        if len(move) == 4:
+            self.board[move[0]][move[1]] = mover
+        self.current_player = mover
+        self.turn_count = turn_count
+        self.p1_pieces = p1_pieces
+        self.p2_pieces = p2_pieces
+        self.zobrist_board = zobrist_board
+
+    # checks if the move that returned token won the game, only looking at the cells it touched
+    def check_move_winner(self, token):
+        return self.check_winner_at(token[1], token[2])
+
     # Play the game
     def play(self):
         while True:
@@ -1,32 +1,34 @@
 import random
 from PushBattle import Game, PLAYER1, PLAYER2, EMPTY, BOARD_SIZE, NUM_PIECES, _torus
+from movegen import legal_moves, is_placement, encode_move, decode_move
+from bitboard import BitboardGame
+from transposition import TranspositionTable, EXACT, LOWER, UPPER
+from deadline import Deadline, SearchTimeout
+from move_ordering import MoveOrderer
+from symmetry import unique_moves
 
 class AlphaBetaAgent:
-    def __init__(self, player=PLAYER1, depth=3):
+    def __init__(self, player=PLAYER1, depth=3, tt_mb=64, time_limit=None, move_ordering=True, symmetry_pruning=True):
         self.player = player
-        self.depth = depth
+        self.depth = depth                      # deepest iteration of iterative deepening
+        self.tt = TranspositionTable(tt_mb)     # shared across all moves of the game
+        self.time_limit = time_limit            # seconds per move, None to always finish self.depth
+        self.deadline = Deadline()
+        self.orderer = MoveOrderer() if move_ordering else None
+        self.root_depth = depth                 # depth of the iteration being searched, to turn depth into ply
+        self.nodes = 0                          # nodes searched by the last get_best_move
+        self.symmetry_pruning = symmetry_pruning  # search only one of the root moves that are symmetric to each other
 
     def get_possible_moves(self, game):
         """Returns list of all possible moves in the current state."""
-        moves = []
-        current_pieces = game.p1_pieces if game.current_player == PLAYER1 else game.p2_pieces
-
-        if current_pieces < NUM_PIECES:
-            # Placement moves
-            for r in range(BOARD_SIZE):
-                for c in range(BOARD_SIZE):
-                    if game.board[r][c] == EMPTY:
-                        moves.append((r, c))
-        else:
-            # Movement moves
-            for r0 in range(BOARD_SIZE):
-                for c0 in range(BOARD_SIZE):
-                    if game.board[r0][c0] == game.current_player:
-                        for r1 in range(BOARD_SIZE):
-                            for c1 in range(BOARD_SIZE):
-                                if game.board[r1][c1] == EMPTY:
-                                    moves.append((r0, c0, r1, c1))
-        return moves
+        return legal_moves(game)
+
+    def get_root_moves(self, game):
+        """Returns the moves to search at the root, keeping one move of every group of symmetric moves."""
+        possible_moves = self.get_possible_moves(game)
+        if self.symmetry_pruning:
+            possible_moves = unique_moves(game, possible_moves)
+        return possible_moves
 
     def evaluate(self, game):
         """Enhanced evaluation function to assess board strength."""
@@ -48,65 +50,151 @@ class AlphaBetaAgent:
 
         return score
 
+    def terminal_value(self, game, token):
+        """Returns the score of the position if the move in token ended the game, otherwise None."""
+        winner = game.check_move_winner(token)
+        if winner == EMPTY:
+            return None
+        return float('inf') if winner == self.player else float('-inf')
+
+    def order_moves(self, game, possible_moves, tt_move, depth):
+        """Sorts the moves with the move orderer, or just moves the transposition table's best move to the front."""
+        if self.orderer is not None:
+            return self.orderer.order(game, possible_moves, self.root_depth - depth, tt_move)
+        if tt_move is not None and tt_move in possible_moves:
+            possible_moves.remove(tt_move)
+            possible_moves.insert(0, tt_move)
+        return possible_moves
+
     def alpha_beta(self, game, depth, alpha, beta, maximizing_player):
         """Minimax algorithm with alpha-beta pruning."""
-        winner = game.check_winner()
-        if winner != EMPTY:
-            return float('inf') if winner == self.player else float('-inf')
-        
+        self.deadline.check()
+        self.nodes += 1
         if depth == 0:
             return self.evaluate(game)
+
+        # transposition table lookup
+        key = game.zobrist_key
+        tt_move = None
+        entry = self.tt.probe(key)
+        if entry is not None:
+            tt_depth, tt_flag, tt_value, tt_code = entry
+            if tt_depth >= depth:
+                if tt_flag == EXACT:
+                    return tt_value
+                elif tt_flag == LOWER:
+                    alpha = max(alpha, tt_value)
+                else:
+                    beta = min(beta, tt_value)
+                if beta <= alpha:
+                    return tt_value
+            tt_move = decode_move(tt_code, is_placement(game))
+        alpha_orig, beta_orig = alpha, beta
         
-        possible_moves = self.get_possible_moves(game)
+        possible_moves = self.order_moves(game, self.get_possible_moves(game), tt_move, depth)
+        best_move = None
         if maximizing_player:
             max_eval = float('-inf')
             for move in possible_moves:
-                new_game = game  # use clone to create a copy of the game state
-                if len(move) == 2:
-                    new_game.place_checker(move[0], move[1])
-                else:
-                    new_game.move_checker(move[0], move[1], move[2], move[3])
-
-                eval = self.alpha_beta(new_game, depth - 1, alpha, beta, False)
-                max_eval = max(max_eval, eval)
+                token = game.make_move(move)
+                eval = self.terminal_value(game, token)
+                if eval is None:
+                    eval = self.alpha_beta(game, depth - 1, alpha, beta, False)
+                game.unmake_move(token)
+                if eval > max_eval or best_move is None:
+                    max_eval = eval
+                    best_move = move
                 alpha = max(alpha, eval)
                 if beta <= alpha:
+                    self.record_cutoff(move, depth)
                     break  # beta cut-off
-            return max_eval
+            value = max_eval
         else:
             min_eval = float('inf')
             for move in possible_moves:
-                new_game = game
-                if len(move) == 2:
-                    new_game.place_checker(move[0], move[1])
-                else:
-                    new_game.move_checker(move[0], move[1], move[2], move[3])
-
-                eval = self.alpha_beta(new_game, depth - 1, alpha, beta, True)
-                min_eval = min(min_eval, eval)
+                token = game.make_move(move)
+                eval = self.terminal_value(game, token)
+                if eval is None:
+                    eval = self.alpha_beta(game, depth - 1, alpha, beta, True)
+                game.unmake_move(token)
+                if eval < min_eval or best_move is None:
+                    min_eval = eval
+                    best_move = move
                 beta = min(beta, eval)
                 if beta <= alpha:
+                    self.record_cutoff(move, depth)
                     break  # alpha cut-off
-            return min_eval
+            value = min_eval
 
-    def get_best_move(self, game):
-        """Returns the best move using the Alpha-Beta pruning algorithm."""
-        possible_moves = self.get_possible_moves(game)
+        # the value is only a bound if it fell outside the window
+        if value <= alpha_orig:
+            flag = UPPER
+        elif value >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt.store(key, depth, flag, value, encode_move(best_move))
+        return value
+
+    def record_cutoff(self, move, depth):
+        """Feeds a cut-off move to the killer and history tables."""
+        if self.orderer is not None:
+            self.orderer.record_cutoff(move, self.root_depth - depth, depth)
+
+    def search_root(self, game, depth):
+        """Searches every root move to depth and returns (best move, best value)."""
+        entry = self.tt.probe(game.zobrist_key)
+        tt_move = decode_move(entry[3], is_placement(game)) if entry is not None else None
+        self.root_depth = depth
+        possible_moves = self.order_moves(game, self.get_root_moves(game), tt_move, depth)
         best_move = None
-        best_value = float('-inf') if game.current_player == self.player else float('inf')
+        maximizing_player = game.current_player == self.player
+        best_value = float('-inf') if maximizing_player else float('inf')
 
         for move in possible_moves:
-            new_game = game
-            if len(move) == 2:
-                new_game.place_checker(move[0], move[1])
-            else:
-                new_game.move_checker(move[0], move[1], move[2], move[3])
-
-            move_value = self.alpha_beta(new_game, self.depth - 1, float('-inf'), float('inf'), game.current_player == self.player)
+            token = game.make_move(move)
+            move_value = self.terminal_value(game, token)
+            if move_value is None:
+                # later moves only need to be searched far enough to show they are no better
+                if maximizing_player:
+                    move_value = self.alpha_beta(game, depth - 1, best_value, float('inf'), False)
+                else:
+                    move_value = self.alpha_beta(game, depth - 1, float('-inf'), best_value, True)
+            game.unmake_move(token)
 
-            if (game.current_player == self.player and move_value > best_value) or \
-               (game.current_player != self.player and move_value < best_value):
+            if (maximizing_player and move_value > best_value) or \
+               (not maximizing_player and move_value < best_value):
                 best_value = move_value
                 best_move = move
 
+        if best_move is None:
+            best_move = possible_moves[0]
+        self.tt.store(game.zobrist_key, depth, EXACT, best_value, encode_move(best_move))
+        return best_move, best_value
+
+    def get_best_move(self, game):
+        """Returns the best move using iterative deepening Alpha-Beta search within the time limit."""
+        game = BitboardGame.from_game(game)  # search on a private bitboard copy using make/unmake
+        self.tt.new_search()
+        if self.orderer is not None:
+            self.orderer.new_search()
+        self.deadline = Deadline(self.time_limit)
+        self.nodes = 0
+        best_move = None
+        for depth in range(1, self.depth + 1):
+            try:
+                # an interrupted search leaves its moves on the board, so every iteration gets its own copy
+                best_move, best_value = self.search_root(game.copy(), depth)
+            except SearchTimeout:
+                break   # keep the move of the last completed iteration
+            if best_value in (float('inf'), float('-inf')):
+                break   # the result is decided, searching deeper cannot change it
+        self.deadline = Deadline()
+
+        if best_move is None:
+            # not even the first iteration finished: fall back to the stored best move or the first legal one
+            possible_moves = self.get_possible_moves(game)
+            entry = self.tt.probe(game.zobrist_key)
+            tt_move = decode_move(entry[3], is_placement(game)) if entry is not None else None
+            best_move = tt_move if tt_move in possible_moves else possible_moves[0]
         return best_move
@@ -0,0 +1,264 @@
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+from PushBattle import PLAYER1, PLAYER2, EMPTY
+from judge_engine import Judge, Agent, TIMEOUT, RANDOM_MOVES
+from tournament import round_robin, Standings
+
+'''
+Asyncio judge: plays many games at once against a fleet of agent servers.
+AsyncJudge keeps Judge's rules (the same payloads, two attempts, random fallback moves, forfeits and game string)
+and only makes the transport asynchronous, so one process can keep hundreds of games in flight.
+Every server gets a ConnectionPool of keep-alive HTTP/1.1 connections shared by all the games it plays; the
+players tell the games apart by their game_id (see sessions.py). Each request has TIMEOUT seconds in total,
+and a request that fails or times out counts as a failed attempt, as in judge_engine.
+'''
+
+POOL_SIZE = 64          # Connections kept open to one agent server
+CONCURRENT_GAMES = 100  # Games in flight at once
+GAMES_PER_PAIR = 2      # Games of every pairing of servers, half with each colour
+MAX_TURNS = None        # Turns after which a game is called a draw (None plays on like judge_engine)
+
+class StaleConnection(Exception):
+    """Raised when a reused keep-alive connection was closed by the server before it answered."""
+
+class ConnectionPool:
+    def __init__(self, url, size=POOL_SIZE):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.base = parts.path.rstrip('/')
+        self.idle = []                          # open (reader, writer) pairs ready for a request
+        self.slots = asyncio.Semaphore(size)    # requests in flight on this server
+        self.opened = 0                         # connections opened, to see how well they are reused
+
+    async def request(self, method, path, payload=None, timeout=TIMEOUT):
+        """Sends a request and returns (status code, body); raises OSError or asyncio.TimeoutError on failure."""
+        body = json.dumps(payload).encode() if payload is not None else b''
+        async with self.slots:
+            return await asyncio.wait_for(self.exchange(method, path, body), timeout)
+
+    async def exchange(self, method, path, body):
+        """Runs one request on an idle connection, or on a new one if the idle one turns out to be closed."""
+        while self.idle:
+            connection = self.idle.pop()
+            try:
+                return await self.send(connection, method, path, body, reused=True)
+            except StaleConnection:
+                continue
+        self.opened += 1
+        connection = await asyncio.open_connection(self.host, self.port)
+        return await self.send(connection, method, path, body, reused=False)
+
+    async def send(self, connection, method, path, body, reused):
+        reader, writer = connection
+        try:
+            head = (f"{method} {self.base}{path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n")
+            writer.write(head.encode('latin-1') + body)
+            await writer.drain()
+            status_line = await reader.readline()
+            if not status_line:
+                if reused:
+                    raise StaleConnection()
+                raise ConnectionResetError("connection closed before the response")
+            version, status = status_line.decode('latin-1').split()[:2]
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            if 'content-length' in headers:
+                response = await reader.readexactly(int(headers['content-length']))
+                connection_header = headers.get('connection', '').lower()
+                keep_alive = connection_header == 'keep-alive' or (version == 'HTTP/1.1' and connection_header != 'close')
+            else:
+                response = await reader.read()  # the body runs to the end of the connection
+                keep_alive = False
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            writer.close()
+            if reused:
+                raise StaleConnection() from e
+            raise
+        except BaseException:
+            writer.close()  # cancelled by the timeout: the late response would confuse the next request
+            raise
+        if keep_alive:
+            self.idle.append(connection)
+        else:
+            writer.close()
+        return int(status), response
+
+    def close(self):
+        for _, writer in self.idle:
+            writer.close()
+        self.idle = []
+
+class AsyncJudge(Judge):
+    def __init__(self, p1_pool, p2_pool, verbose=False, strict_fallback=False):
+        super().__init__(f"http://{p1_pool.host}:{p1_pool.port}", f"http://{p2_pool.host}:{p2_pool.port}", strict_fallback)
+        self.p1_pool = p1_pool
+        self.p2_pool = p2_pool
+        self.verbose = verbose
+
+    async def post(self, pool, path, payload):
+        """Posts to a player and returns (status code, body), or None if the request failed or timed out."""
+        try:
+            return await pool.request('POST', path, payload)
+        except (OSError, ValueError, asyncio.TimeoutError):
+            return None
+
+    async def check_latency(self):
+        """Check latency for both players and create their agents"""
+        agents = []
+        for pool, participant, name in ((self.p1_pool, "Participant1", "Agent1"), (self.p2_pool, "Participant2", "Agent2")):
+            start_time = time.time()
+            try:
+                status, _ = await pool.request('GET', '/')
+            except (OSError, ValueError, asyncio.TimeoutError):
+                return False
+            if status != 200:
+                return False
+            agent = Agent(participant, name)
+            agent.latency = time.time() - start_time
+            agents.append(agent)
+        self.p1_agent, self.p2_agent = agents
+        return True
+
+    async def start_game(self):
+        """ Start the game for both players """
+        starting_data = self.start_data()
+        starting_data['first_turn'] = True
+        if await self.post(self.p1_pool, '/start', starting_data) is None:
+            return False
+        starting_data['first_turn'] = False
+        return await self.post(self.p2_pool, '/start', starting_data) is not None
+
+    async def receive_move(self, attempt_number, p1_random, p2_random):
+        """ Receive the move of the current player and play it """
+        move_data = self.move_data(attempt_number, p1_random, p2_random)
+        if self.game.current_player == PLAYER1:
+            pool, participant = self.p1_pool, self.p1_agent
+        else:
+            pool, participant = self.p2_pool, self.p2_agent
+        start_time = time.time()
+        response = await self.post(pool, '/move', move_data)
+        participant.latency = time.time() - start_time
+
+        # receiving the move
+        if response is None or response[0] != 200:
+            return False
+        try:
+            move = json.loads(response[1])
+        except ValueError:
+            return False
+        return self.handle_move(self.game, move.get('move') if isinstance(move, dict) else None)
+
+    async def end_game(self, winner):
+        """ End the game for both players """
+        end_data = self.end_data(winner)
+        await self.post(self.p1_pool, '/end', end_data)
+        await self.post(self.p2_pool, '/end', end_data)
+        self.log("Draw" if winner == EMPTY else f"Winner: {'PLAYER1' if winner == PLAYER1 else 'PLAYER2'}")
+
+    async def play_game(self, max_turns=MAX_TURNS):
+        """ Plays the game to the end and returns the winner, with the turn logic of Judge.play_game """
+        self.random_moves = {PLAYER1: RANDOM_MOVES, PLAYER2: RANDOM_MOVES}
+
+        winner = None
+        while winner is None:
+            if not self.start_turn(max_turns):
+                winner = EMPTY
+                break
+
+            self.log("First move attempt")
+            attempt = await self.receive_move(1, self.random_moves[PLAYER1], self.random_moves[PLAYER2])
+
+            if not attempt:
+                self.log("Second move attempt")
+                attempt = await self.receive_move(2, self.random_moves[PLAYER1], self.random_moves[PLAYER2])
+
+            winner = self.finish_turn(attempt)
+
+        await self.end_game(winner)
+        self.log("Game String:", self.game_str)
+        return winner
+
+async def play_one(index, p1_pool, p2_pool, slots, max_turns=MAX_TURNS):
+    """Plays one game once a slot is free and returns its record (with an error instead of a winner if it never
+    started or raised). A game that raises is recorded with the position it reached, so the other games go on."""
+    async with slots:
+        judge = AsyncJudge(p1_pool, p2_pool)
+        record = {'game': index, 'p1': judge.p1_url, 'p2': judge.p2_url, 'game_id': judge.game_id}
+        start = time.perf_counter()
+        try:
+            if not await judge.check_latency():
+                record['error'] = "Failed to connect to one or both players"
+            elif not await judge.start_game():
+                record['error'] = "Failed to start game"
+            else:
+                winner = await judge.play_game(max_turns)
+                record.update(winner=int(winner), turns=judge.game.turn_count, game_str=judge.game_str)
+        except Exception as e:
+            # e.g. a move handle_move cannot read (see Judge.strict_fallback) or a connection that failed twice
+            record.update(error=f"{type(e).__name__}: {e}", turns=judge.game.turn_count, game_str=judge.game_str)
+        record['seconds'] = round(time.perf_counter() - start, 3)
+        return record
+
+async def run_games(pairings, concurrency=CONCURRENT_GAMES, pool_size=POOL_SIZE, max_turns=MAX_TURNS, path=None, progress=None):
+    """Plays every (p1 url, p2 url) game with at most concurrency games in flight and returns their records.
+    Records are appended to path (if given) and passed to progress (if given) as games finish."""
+    pools = {}
+    for pair in pairings:
+        for url in pair:
+            pools.setdefault(url, ConnectionPool(url, pool_size))
+    slots = asyncio.Semaphore(concurrency)
+    tasks = [asyncio.create_task(play_one(i, pools[p1], pools[p2], slots, max_turns)) for i, (p1, p2) in enumerate(pairings)]
+    out = open(path, 'a') if path is not None else None
+    records = []
+    try:
+        for task in asyncio.as_completed(tasks):
+            record = await task
+            records.append(record)
+            if out is not None:
+                out.write(json.dumps(record) + '\n')
+                out.flush()
+            if progress is not None:
+                progress(record)
+    finally:
+        if out is not None:
+            out.close()
+        for pool in pools.values():
+            pool.close()
+    return records
+
+def main():
+    parser = argparse.ArgumentParser(description="Plays games between agent servers, many at once.")
+    parser.add_argument('urls', nargs='+', help='agent servers, e.g. http://127.0.0.1:5008 http://127.0.0.1:5009')
+    parser.add_argument('--games', type=int, default=GAMES_PER_PAIR, help='games per pairing of servers')
+    parser.add_argument('--concurrency', type=int, default=CONCURRENT_GAMES, help='games in flight at once')
+    parser.add_argument('--pool-size', type=int, default=POOL_SIZE, help='connections kept open per server')
+    parser.add_argument('--max-turns', type=int, default=MAX_TURNS, help='turns before a draw is called')
+    parser.add_argument('--out', default=None, help='JSON lines file the game records are appended to')
+    args = parser.parse_args()
+
+    def progress(record):
+        result = record['error'] if 'error' in record else f"winner {record['winner']} in {record['turns']} turns"
+        print(f"{record['p1']} vs {record['p2']}: {result}")
+
+    pairings = round_robin(args.urls, args.games)
+    start = time.perf_counter()
+    records = asyncio.run(run_games(pairings, args.concurrency, args.pool_size, args.max_turns, args.out, progress))
+    print(f"\n{len(records)} games in {time.perf_counter() - start:.1f}s\n")
+    standings = Standings(args.urls)
+    for record in records:
+        if 'error' not in record:
+            standings.add(record)
+    print(standings.table())
+
+if __name__ == '__main__':
+    main()
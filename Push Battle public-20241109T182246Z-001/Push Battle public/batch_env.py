@@ -0,0 +1,132 @@
+import numpy as np
+from PushBattle import Game, PLAYER1, PLAYER2, EMPTY, BOARD_SIZE, NUM_PIECES, WINDOWS
+from bitboard import NUM_CELLS, DIRECTIONS
+
+'''
+Batched Push Battle engine for random playouts and self-play data.
+BatchedGames holds N games as stacked numpy arrays and advances all of them by one move per step,
+with the push rule and the win check done as array operations. Cells are flat indices r * BOARD_SIZE + c.
+'''
+
+NO_CELL = -1    # Source cell of a placement, and the move of a finished game
+
+# Flat cell indices of every three-in-a-row window
+WINDOW_CELLS = np.array([[r * BOARD_SIZE + c for r, c in window] for window in WINDOWS], dtype=np.intp)
+
+##################
+
+def apply_pushes(boards, games, r, c):
+    """Pushes the neighbors of the piece just put on (r[i], c[i]) of boards[games[i]], for every i at once."""
+    # the eight pushes never interact, so all of them are decided on the board before any push
+    before = boards[games]
+    rows = np.arange(len(games))
+    for dr, dc in DIRECTIONS:
+        r1, c1 = (r + dr) % BOARD_SIZE, (c + dc) % BOARD_SIZE
+        r2, c2 = (r + 2 * dr) % BOARD_SIZE, (c + 2 * dc) % BOARD_SIZE
+        pushed = (before[rows, r1, c1] != EMPTY) & (before[rows, r2, c2] == EMPTY)
+        k = games[pushed]
+        boards[k, r2[pushed], c2[pushed]] = before[rows[pushed], r1[pushed], c1[pushed]]
+        boards[k, r1[pushed], c1[pushed]] = EMPTY
+
+def find_winners(boards, movers):
+    """Returns the winner of every board, giving the win to the mover when both players have three in a row."""
+    cells = boards.reshape(len(boards), NUM_CELLS)[:, WINDOW_CELLS]
+    p1_wins = (cells == PLAYER1).all(axis=2).any(axis=1)
+    p2_wins = (cells == PLAYER2).all(axis=2).any(axis=1)
+    winners = np.where(p1_wins, PLAYER1, np.where(p2_wins, PLAYER2, EMPTY)).astype(np.int8)
+    both = p1_wins & p2_wins
+    winners[both] = movers[both]
+    return winners
+
+class BatchedGames:
+    def __init__(self, n, max_turns=None):
+        self.n = n
+        self.max_turns = max_turns      # turn after which an undecided game ends as a draw, None to never stop
+        self.boards = np.zeros((n, BOARD_SIZE, BOARD_SIZE), dtype=np.int8)
+        self.current_player = np.full(n, PLAYER1, dtype=np.int8)
+        self.turn_count = np.zeros(n, dtype=np.int64)
+        self.p1_pieces = np.zeros(n, dtype=np.int64)
+        self.p2_pieces = np.zeros(n, dtype=np.int64)
+        self.done = np.zeros(n, dtype=bool)
+        self.winner = np.zeros(n, dtype=np.int8)    # EMPTY while a game goes on, and for a draw
+
+    @classmethod
+    def from_game(cls, game, n, max_turns=None):
+        """Returns n copies of game."""
+        batch = cls(n, max_turns)
+        batch.boards[:] = np.asarray(game.board, dtype=np.int8)
+        batch.current_player[:] = game.current_player
+        batch.turn_count[:] = game.turn_count
+        batch.p1_pieces[:] = game.p1_pieces
+        batch.p2_pieces[:] = game.p2_pieces
+        return batch
+
+    def to_game(self, i):
+        """Returns game i as a Game."""
+        game = Game()
+        game.board = self.boards[i].astype(int)
+        game.current_player = int(self.current_player[i])
+        game.turn_count = int(self.turn_count[i])
+        game.p1_pieces = int(self.p1_pieces[i])
+        game.p2_pieces = int(self.p2_pieces[i])
+        game.rehash()
+        return game
+
+    def active(self):
+        """Returns the indices of the games that are still going on."""
+        return np.flatnonzero(~self.done)
+
+    def placement(self):
+        """Returns, for every game, True if the player to move still has pieces to place."""
+        pieces = np.where(self.current_player == PLAYER1, self.p1_pieces, self.p2_pieces)
+        return pieces < NUM_PIECES
+
+    def random_moves(self, rng):
+        """Returns (src, dst) arrays with a uniformly random legal move for every game (NO_CELL for finished games)."""
+        flat = self.boards.reshape(self.n, NUM_CELLS)
+        # the largest of uniform random keys over the allowed cells is a uniform pick among them
+        dst = np.where(flat == EMPTY, rng.random((self.n, NUM_CELLS)), -1.0).argmax(axis=1)
+        own = flat == self.current_player[:, None]
+        src = np.where(own, rng.random((self.n, NUM_CELLS)), -1.0).argmax(axis=1)
+        src[self.placement()] = NO_CELL
+        src[self.done] = NO_CELL
+        dst[self.done] = NO_CELL
+        return src, dst
+
+    def step(self, src, dst):
+        """Plays move (src[i], dst[i]) in every unfinished game i; src[i] is NO_CELL for a placement."""
+        games = self.active()
+        src, dst = src[games], dst[games]
+        movers = self.current_player[games]
+
+        moving = src != NO_CELL
+        self.boards[games[moving], src[moving] // BOARD_SIZE, src[moving] % BOARD_SIZE] = EMPTY
+        r, c = dst // BOARD_SIZE, dst % BOARD_SIZE
+        self.boards[games, r, c] = movers
+        placing = ~moving
+        self.p1_pieces[games[placing & (movers == PLAYER1)]] += 1
+        self.p2_pieces[games[placing & (movers == PLAYER2)]] += 1
+        apply_pushes(self.boards, games, r, c)
+
+        self.turn_count[games] += 1
+        self.current_player[games] = -movers
+        winners = find_winners(self.boards[games], movers)
+        self.winner[games] = winners
+        finished = winners != EMPTY
+        if self.max_turns is not None:
+            finished |= self.turn_count[games] >= self.max_turns
+        self.done[games[finished]] = True
+        return games[finished]
+
+    def playout(self, rng, max_steps=None):
+        """Plays random moves until every game is finished (or max_steps runs out) and returns the winners."""
+        steps = 0
+        while not self.done.all() and (max_steps is None or steps < max_steps):
+            self.step(*self.random_moves(rng))
+            steps += 1
+        return self.winner
+
+def random_playouts(game, n, rng, max_plies=None):
+    """Returns the winners of n random games played out from game (EMPTY for games cut off at max_plies)."""
+    batch = BatchedGames.from_game(game, n)
+    return batch.playout(rng, max_plies)
@@ -0,0 +1,67 @@
+import random
+import time
+from PushBattle import Game, EMPTY
+from random_agent import RandomAgent
+from alphabeta_agent import AlphaBetaAgent
+
+'''
+Measures how many nodes AlphaBetaAgent searches per move with and without move ordering.
+The positions come from seeded random games, so every run searches the same set.
+'''
+
+SEED = 2024         # Seed for the random games that produce the positions
+NUM_POSITIONS = 8   # Number of positions in the set
+PLACEMENT_DEPTH = 3 # Search depth used for placement-phase positions
+MOVEMENT_DEPTH = 3  # Search depth used for movement-phase positions
+
+def make_positions(seed=SEED, num_positions=NUM_POSITIONS):
+    """Returns a fixed list of undecided positions from both phases of the game."""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < num_positions:
+        # alternate between placement (turns 4-12) and movement (turns 17-30) positions
+        turns = rng.randint(4, 12) if len(positions) % 2 == 0 else rng.randint(17, 30)
+        game = Game()
+        decided = False
+        for _ in range(turns):
+            moves = RandomAgent().get_possible_moves(game)
+            token = game.make_move(rng.choice(moves))
+            if game.check_move_winner(token) != EMPTY:
+                decided = True
+                break
+        if not decided and not has_immediate_win(game):
+            positions.append(game)
+    return positions
+
+def has_immediate_win(game):
+    """Returns True if the player to move can win on the spot (such positions are solved at depth 1)."""
+    for move in RandomAgent().get_possible_moves(game):
+        token = game.make_move(move)
+        winner = game.check_move_winner(token)
+        game.unmake_move(token)
+        if winner == token[2]:
+            return True
+    return False
+
+def count_nodes(game, move_ordering):
+    """Returns (nodes, seconds) for one fixed-depth search of game."""
+    placement = (game.p1_pieces if game.current_player == 1 else game.p2_pieces) < 8
+    agent = AlphaBetaAgent(player=game.current_player, depth=PLACEMENT_DEPTH if placement else MOVEMENT_DEPTH,
+                           move_ordering=move_ordering)
+    start = time.perf_counter()
+    agent.get_best_move(game)
+    return agent.nodes, time.perf_counter() - start
+
+def main():
+    total = {False: 0, True: 0}
+    print(f"{'position':>8} {'turn':>5} {'unordered':>10} {'ordered':>10} {'ratio':>6}")
+    for i, game in enumerate(make_positions()):
+        nodes = {}
+        for move_ordering in (False, True):
+            nodes[move_ordering], _ = count_nodes(game, move_ordering)
+            total[move_ordering] += nodes[move_ordering]
+        print(f"{i:>8} {game.turn_count:>5} {nodes[False]:>10} {nodes[True]:>10} {nodes[False] / max(nodes[True], 1):>6.1f}")
+    print(f"{'total':>8} {'':>5} {total[False]:>10} {total[True]:>10} {total[False] / max(total[True], 1):>6.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,352 @@
+import numpy as np
+from PushBattle import Game, PLAYER1, PLAYER2, EMPTY, BOARD_SIZE, NUM_PIECES, _torus, WINDOWS, CELL_WINDOWS, ZOBRIST_PIECES
+
+'''
+Bitboard backend for the Push Battle engine.
+Each player's pieces are kept in one 64-bit occupancy mask, where cell (r, c) is bit r * BOARD_SIZE + c.
+BitboardGame can be used anywhere a Game is expected; the numpy board is still available for reading.
+The inherited methods keep Game's signatures; place_checker_mask, move_checker_mask, push_neighbors_mask and
+check_winner_at_mask are the mask versions used by make_move and the searches.
+'''
+
+NUM_CELLS = BOARD_SIZE * BOARD_SIZE     # Number of cells on the board
+FULL_MASK = (1 << NUM_CELLS) - 1        # Mask with every cell set
+
+# Push directions, in the same order as Game.push_neighbors
+DIRECTIONS = [(-1, -1), (-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1)]
+
+# Directions of the lines that count for three in a row (rows, cols, negative and positive diagonals)
+LINE_DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+##################
+
+def cell_index(r, c):
+    """Returns the bit index of cell (r, c)."""
+    return r * BOARD_SIZE + c
+
+def cell_bit(r, c):
+    """Returns the mask with only cell (r, c) set."""
+    return 1 << (r * BOARD_SIZE + c)
+
+def iter_bits(mask):
+    """Yields the bit index of every set cell in mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def mask_from_array(cells):
+    """Converts an 8x8 boolean array into an occupancy mask."""
+    bits = np.packbits(np.asarray(cells, dtype=bool).ravel(), bitorder='little')
+    return int(bits.view('<u8')[0])
+
+def array_from_mask(mask):
+    """Converts an occupancy mask into an 8x8 array of 0s and 1s."""
+    bits = np.unpackbits(np.array([mask], dtype='<u8').view(np.uint8), bitorder='little')
+    return bits.reshape(BOARD_SIZE, BOARD_SIZE).astype(int)
+
+# Column masks: COLUMNS_BELOW[k] has every cell whose column is < BOARD_SIZE - k (the cells that do not wrap on a shift of k)
+COLUMNS_BELOW = [
+    sum(1 << cell_index(r, c) for r in range(BOARD_SIZE) for c in range(BOARD_SIZE - k))
+    for k in range(BOARD_SIZE)
+]
+
+def _build_shift_table():
+    """Precomputes (row bits, col shift, keep mask, wrap mask) for every torus shift (dr, dc)."""
+    table = {}
+    for dr in range(-2, 3):
+        for dc in range(-2, 3):
+            k = dc % BOARD_SIZE
+            table[(dr, dc)] = ((dr % BOARD_SIZE) * BOARD_SIZE, k, COLUMNS_BELOW[k], FULL_MASK ^ COLUMNS_BELOW[k])
+    return table
+
+SHIFT_TABLE = _build_shift_table()
+
+def torus_shift(mask, dr, dc):
+    """Moves every set cell (r, c) of mask to (r + dr, c + dc), wrapping around the edges."""
+    row_bits, k, keep, wrap = SHIFT_TABLE[(dr, dc)]
+    if row_bits:
+        mask = ((mask << row_bits) | (mask >> (NUM_CELLS - row_bits))) & FULL_MASK
+    if k:
+        mask = ((mask & keep) << k) | ((mask & wrap) >> (BOARD_SIZE - k))
+    return mask
+
+def _build_push_table():
+    """Precomputes, for every cell, the (neighbor bit, secondary neighbor bit, Player1 key change, Player2 key change) of each push direction."""
+    table = []
+    for r in range(BOARD_SIZE):
+        for c in range(BOARD_SIZE):
+            pushes = []
+            for dr, dc in DIRECTIONS:
+                r1, c1 = _torus(r + dr, c + dc)
+                r2, c2 = _torus(r1 + dr, c1 + dc)
+                i1, i2 = cell_index(r1, c1), cell_index(r2, c2)
+                pushes.append((1 << i1, 1 << i2,
+                               ZOBRIST_PIECES[PLAYER1][i1] ^ ZOBRIST_PIECES[PLAYER1][i2],
+                               ZOBRIST_PIECES[PLAYER2][i1] ^ ZOBRIST_PIECES[PLAYER2][i2]))
+            table.append(tuple(pushes))
+    return table
+
+PUSH_TABLE = _build_push_table()
+
+# WINDOW_MASKS[i] is the mask of the three cells of WINDOWS[i]
+WINDOW_MASKS = [sum(cell_bit(r, c) for r, c in window) for window in WINDOWS]
+
+# CELL_WINDOW_MASKS[cell] lists the masks of the 12 windows that pass through cell
+CELL_WINDOW_MASKS = [
+    tuple(WINDOW_MASKS[i] for i in CELL_WINDOWS[r][c])
+    for r in range(BOARD_SIZE) for c in range(BOARD_SIZE)
+]
+
+def has_three(mask):
+    """Returns True if mask contains three cells in a row on the torus."""
+    for dr, dc in LINE_DIRECTIONS:
+        if mask & torus_shift(mask, dr, dc) & torus_shift(mask, 2 * dr, 2 * dc):
+            return True
+    return False
+
+def completion_cells(mask):
+    """Returns the cells outside mask that would give mask three in a row if occupied (pushes ignored)."""
+    cells = 0
+    for dr, dc in LINE_DIRECTIONS:
+        ahead = torus_shift(mask, -dr, -dc)          # cells whose next cell along the line is set
+        ahead2 = torus_shift(mask, -2 * dr, -2 * dc)
+        behind = torus_shift(mask, dr, dc)           # cells whose previous cell along the line is set
+        behind2 = torus_shift(mask, 2 * dr, 2 * dc)
+        cells |= (ahead & ahead2) | (ahead & behind) | (behind & behind2)
+    return cells & ~mask
+
+class BitboardGame(Game):
+    def __init__(self):
+        self.p1_mask = 0        # Cells occupied by Player1
+        self.p2_mask = 0        # Cells occupied by Player2
+        self._board = None      # Cached numpy board, rebuilt from the masks when read
+        super().__init__()
+
+    # The numpy board is rebuilt from the masks on demand and is read-only; write through the game methods instead
+    @property
+    def board(self):
+        if self._board is None:
+            board = array_from_mask(self.p1_mask) * PLAYER1 + array_from_mask(self.p2_mask) * PLAYER2
+            board.flags.writeable = False
+            self._board = board
+        return self._board
+
+    @board.setter
+    def board(self, board):
+        board = np.asarray(board)
+        self.p1_mask = mask_from_array(board == PLAYER1)
+        self.p2_mask = mask_from_array(board == PLAYER2)
+        self._board = None
+        self.rehash()
+
+    # Creates a BitboardGame with the same state as any Game
+    @classmethod
+    def from_game(cls, game):
+        if isinstance(game, BitboardGame):
+            return game.copy()
+        return cls.from_dict(game.to_dict())
+
+    # Returns an independent copy of the game
+    def copy(self):
+        game = self.__class__.__new__(self.__class__)
+        game.__dict__.update(self.__dict__)
+        return game
+
+    # Recomputes the board hash from the masks
+    def rehash(self):
+        self.zobrist_board = 0
+        for cell in iter_bits(self.p1_mask):
+            self.zobrist_board ^= ZOBRIST_PIECES[PLAYER1][cell]
+        for cell in iter_bits(self.p2_mask):
+            self.zobrist_board ^= ZOBRIST_PIECES[PLAYER2][cell]
+
+    # Returns the board value of (r, c)
+    def get_cell(self, r, c):
+        bit = 1 << (r * BOARD_SIZE + c)
+        if self.p1_mask & bit:
+            return PLAYER1
+        if self.p2_mask & bit:
+            return PLAYER2
+        return EMPTY
+
+    # Checks if the potential PLACEMENT of the piece is valid
+    def is_valid_placement(self, row, col):
+        if self.current_player == PLAYER1 and self.p1_pieces >= NUM_PIECES:
+            print("White has moved all pieces. Must move an existing piece")
+            return False
+        if self.current_player == PLAYER2 and self.p2_pieces >= NUM_PIECES:
+            print("Black has moved all pieces. Must move an existing piece")
+            return False
+        return 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE and not (self.p1_mask | self.p2_mask) & cell_bit(row, col)
+
+    # Checks if the potential MOVEMENT of the piece is valid
+    def is_valid_move(self, r0, c0, r1, c1):
+        # in bounds
+        if not (0 <= r0 < BOARD_SIZE and 0 <= c0 < BOARD_SIZE and
+                0 <= r1 < BOARD_SIZE and 0 <= c1 < BOARD_SIZE):
+            return False
+
+        # is your piece
+        own = self.p1_mask if self.current_player == PLAYER1 else self.p2_mask
+        if not own & cell_bit(r0, c0):
+            print("You can only move your own pieces!")
+            return False
+
+        # is an empty spot
+        if (self.p1_mask | self.p2_mask) & cell_bit(r1, c1):
+            print("Destination square must be empty!")
+            return False
+
+        return True
+
+    # Handles the PLACEMENT of the checker
+    # Returns the cells that became occupied (the placed cell and every pushed piece), as Game.place_checker does
+    def place_checker(self, r, c):
+        return self.cells_of(r, c, self.place_checker_mask(r, c))
+
+    # Handles the MOVEMENT of the checker
+    # Returns the cells that became occupied (the destination and every pushed piece), as Game.move_checker does
+    def move_checker(self, r0, c0, r1, c1):
+        return self.cells_of(r1, c1, self.move_checker_mask(r0, c0, r1, c1))
+
+    # Push mechanic - Pushes all pieces away
+    # Returns the cells the pushed pieces landed on, as Game.push_neighbors does
+    def push_neighbors(self, r0, c0):
+        return self.cells_of(r0, c0, self.push_neighbors_mask(r0, c0))[1:]
+
+    # Converts the mask returned by a *_mask method into Game's list: the origin, then the pushed pieces in push order
+    def cells_of(self, r0, c0, mask):
+        cells = [(r0, c0)]
+        for _, b2, _, _ in PUSH_TABLE[r0 * BOARD_SIZE + c0]:
+            if mask & b2:
+                cells.append(divmod(b2.bit_length() - 1, BOARD_SIZE))
+        return cells
+
+    # place_checker on the masks
+    # Returns the mask of cells that became occupied (the placed cell and every pushed piece)
+    def place_checker_mask(self, r, c):
+        cell = r * BOARD_SIZE + c
+        bit = 1 << cell
+        if self.current_player == PLAYER1:
+            self.p1_mask |= bit
+            self.p1_pieces += 1
+        else:
+            self.p2_mask |= bit
+            self.p2_pieces += 1
+        self.zobrist_board ^= ZOBRIST_PIECES[self.current_player][cell]
+        return bit | self.push_neighbors_mask(r, c)
+
+    # move_checker on the masks
+    # Returns the mask of cells that became occupied (the destination and every pushed piece)
+    def move_checker_mask(self, r0, c0, r1, c1):
+        i0 = r0 * BOARD_SIZE + c0
+        i1 = r1 * BOARD_SIZE + c1
+        src = 1 << i0
+        dst = 1 << i1
+        if self.current_player == PLAYER1:
+            self.p1_mask = (self.p1_mask & ~src) | dst
+            self.p2_mask &= ~(src | dst)
+        else:
+            self.p2_mask = (self.p2_mask & ~src) | dst
+            self.p1_mask &= ~(src | dst)
+        keys = ZOBRIST_PIECES[self.current_player]
+        self.zobrist_board ^= keys[i0] ^ keys[i1]
+        return dst | self.push_neighbors_mask(r1, c1)
+
+    # push_neighbors on the masks
+    # The eight pushes never interact (a secondary neighbor is never an immediate neighbor), so they are applied against the same occupancy
+    # Returns the mask of cells the pushed pieces landed on
+    def push_neighbors_mask(self, r0, c0):
+        p1 = self.p1_mask
+        p2 = self.p2_mask
+        occupied = p1 | p2
+        pushed = 0
+        key = self.zobrist_board
+        for b1, b2, key1, key2 in PUSH_TABLE[r0 * BOARD_SIZE + c0]:
+            if occupied & b1 and not occupied & b2:
+                if p1 & b1:
+                    p1 ^= b1 | b2
+                    key ^= key1
+                else:
+                    p2 ^= b1 | b2
+                    key ^= key2
+                pushed |= b2
+        self.p1_mask = p1
+        self.p2_mask = p2
+        self.zobrist_board = key
+        self._board = None
+        return pushed
+
+    # checks for a winner - 3 in a row
+    def check_winner(self):
+        player1_wins = has_three(self.p1_mask)
+        player2_wins = has_three(self.p2_mask)
+
+        if player1_wins and player2_wins:
+            return self.current_player
+        # If only one player has 3 in a row, they win
+        elif player1_wins:
+            return PLAYER1
+        elif player2_wins:
+            return PLAYER2
+
+        return EMPTY # no one has won the game
+
+    # checks for a winner using only the windows through the given cells
+    # cells - the cells returned by place_checker/move_checker; the position before that move must have had no winner
+    # mover - the player who made the move and wins if both players complete a line (defaults to current_player)
+    def check_winner_at(self, cells, mover=None):
+        return self.check_winner_at_mask(sum(cell_bit(r, c) for r, c in cells), mover)
+
+    # check_winner_at on the masks
+    # cells - the mask returned by place_checker_mask/move_checker_mask
+    def check_winner_at_mask(self, cells, mover=None):
+        if mover is None:
+            mover = self.current_player
+        p1 = self.p1_mask
+        p2 = self.p2_mask
+        player1_wins = False
+        player2_wins = False
+        for cell in iter_bits(cells):
+            bit = 1 << cell
+            if p1 & bit and not player1_wins:
+                for window in CELL_WINDOW_MASKS[cell]:
+                    if p1 & window == window:
+                        player1_wins = True
+                        break
+            elif p2 & bit and not player2_wins:
+                for window in CELL_WINDOW_MASKS[cell]:
+                    if p2 & window == window:
+                        player2_wins = True
+                        break
+
+        if player1_wins and player2_wins:
+            return mover
+        elif player1_wins:
+            return PLAYER1
+        elif player2_wins:
+            return PLAYER2
+
+        return EMPTY # no one has won the game
+
+    # Plays a move [r, c] or [r0, c0, r1, c1] for the current player, then advances turn_count and current_player
+    # Returns an undo token for unmake_move: (move, occupied mask, mover, turn_count, p1_pieces, p2_pieces, zobrist_board, p1_mask, p2_mask)
+    def make_move(self, move):
+        token = (self.current_player, self.turn_count, self.p1_pieces, self.p2_pieces, self.zobrist_board, self.p1_mask, self.p2_mask)
+        if len(move) == 2:
+            changed = self.place_checker_mask(move[0], move[1])
+        else:
+            changed = self.move_checker_mask(move[0], move[1], move[2], move[3])
+        self.turn_count += 1
+        self.current_player = PLAYER2 if token[0] == PLAYER1 else PLAYER1
+        return (move, changed) + token
+
+    # Takes back the move that returned token; moves must be undone in reverse order
+    def unmake_move(self, token):
+        _, _, self.current_player, self.turn_count, self.p1_pieces, self.p2_pieces, self.zobrist_board, self.p1_mask, self.p2_mask = token
+        self._board = None
+
+    # checks if the move that returned token won the game, only looking at the cells it touched
+    def check_move_winner(self, token):
+        return self.check_winner_at_mask(token[1], token[2])
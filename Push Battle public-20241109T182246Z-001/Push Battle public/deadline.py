@@ -0,0 +1,34 @@
+import time
+
+'''
+Time budget for anytime searches.
+A search creates a Deadline when it starts and calls check() inside its node loop; once the budget is spent
+check() raises SearchTimeout, which unwinds the search back to its iterative deepening driver.
+'''
+
+class SearchTimeout(Exception):
+    """Raised inside a search once its deadline has passed."""
+
+class Deadline:
+    def __init__(self, seconds=None):
+        # no budget means the search is never interrupted
+        self.end = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self):
+        """Returns the seconds left in the budget (infinite when there is no budget)."""
+        if self.end is None:
+            return float('inf')
+        return self.end - time.monotonic()
+
+    def expired(self):
+        """Returns True once the budget is spent."""
+        return self.end is not None and time.monotonic() >= self.end
+
+    def stop(self):
+        """Ends the budget now, so a search running in another thread stops at its next check()."""
+        self.end = time.monotonic()
+
+    def check(self):
+        """Raises SearchTimeout once the budget is spent."""
+        if self.end is not None and time.monotonic() >= self.end:
+            raise SearchTimeout()
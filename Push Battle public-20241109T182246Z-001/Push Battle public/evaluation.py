@@ -0,0 +1,179 @@
+import numpy as np
+from PushBattle import PLAYER1, PLAYER2, EMPTY, BOARD_SIZE
+from bitboard import NUM_CELLS, cell_bit, iter_bits
+from batch_env import apply_pushes
+
+'''
+Faster versions of HybridAgent2.get_heuristic.
+child_boards builds every child of a move list as one stacked (N, 8, 8) array, and batch_heuristic scores
+all of them at once with the same pair / triangle / mindist features (and the same 9 / 3 / 1 weights).
+HeuristicFeatures keeps the same features of a BitboardGame up to date through make/unmake, touching only
+the cells a move changed.
+'''
+
+# Neighbor offsets counted once per pair (the four "forward" directions get_heuristic looks at)
+PAIR_OFFSETS = [(-1, 1), (0, 1), (1, 1), (1, 0)]
+
+# The four right-angle triangles get_heuristic counts, as the two offsets that must hold the color
+TRIANGLE_OFFSETS = [((-2, 0), (0, 2)), ((0, 2), (2, 0)), ((2, 0), (0, -2)), ((0, -2), (-2, 0))]
+
+PAIR_WEIGHT = 9
+TRIANGLE_WEIGHT = 3
+MINDIST_WEIGHT = 1
+
+def _build_torus_distance():
+    """Returns the 64x64 table of torus Chebyshev distances between cells."""
+    cells = np.arange(BOARD_SIZE * BOARD_SIZE)
+    rows, cols = cells // BOARD_SIZE, cells % BOARD_SIZE
+    dr = np.abs(rows[:, None] - rows[None, :])
+    dc = np.abs(cols[:, None] - cols[None, :])
+    return np.maximum(np.minimum(dr, BOARD_SIZE - dr), np.minimum(dc, BOARD_SIZE - dc))
+
+TORUS_DISTANCE = _build_torus_distance()    # TORUS_DISTANCE[a, b] for cells a = r * BOARD_SIZE + c
+MAX_MINDIST = 4                             # get_heuristic's mindist when no two pieces are closer
+
+# DISTANCE_RINGS[d - 1] is the 0/1 matrix of cell pairs exactly d apart, for d below MAX_MINDIST
+DISTANCE_RINGS = [(TORUS_DISTANCE == d).astype(np.float32) for d in range(1, MAX_MINDIST)]
+
+##################
+
+def _offset(cells, dr, dc):
+    """Returns cells[:, i + dr, j + dc] (wrapping) for every (i, j)."""
+    return np.roll(cells, (-dr, -dc), axis=(1, 2))
+
+def child_boards(game, moves):
+    """Returns the boards after each (r, c) / (r0, c0, r1, c1) move, stacked into an (N, 8, 8) array."""
+    n = len(moves)
+    boards = np.repeat(np.asarray(game.board, dtype=np.int8)[None], n, axis=0)
+    if n == 0:
+        return boards
+    moves = np.asarray(moves, dtype=np.intp).reshape(n, -1)
+    children = np.arange(n)
+    if moves.shape[1] == 4:
+        boards[children, moves[:, 0], moves[:, 1]] = EMPTY
+        r, c = moves[:, 2], moves[:, 3]
+    else:
+        r, c = moves[:, 0], moves[:, 1]
+    boards[children, r, c] = game.current_player
+    apply_pushes(boards, children, r, c)
+    return boards
+
+def batch_features(boards, color):
+    """Returns the (par, tri, mindist) arrays of color for every board in an (N, 8, 8) stack."""
+    own = (boards == color)
+    par = np.zeros(len(boards), dtype=np.int64)
+    for dr, dc in PAIR_OFFSETS:
+        par += (own & _offset(own, dr, dc)).sum(axis=(1, 2))
+    tri = np.zeros(len(boards), dtype=np.int64)
+    for (dr1, dc1), (dr2, dc2) in TRIANGLE_OFFSETS:
+        tri += (own & _offset(own, dr1, dc1) & _offset(own, dr2, dc2)).sum(axis=(1, 2))
+
+    # mindist is the smallest ring distance at which some pair of pieces sits
+    flat = own.reshape(len(boards), -1).astype(np.float32)
+    mindist = np.full(len(boards), MAX_MINDIST, dtype=np.int64)
+    for d in range(MAX_MINDIST - 1, 0, -1):
+        has_pair = ((flat @ DISTANCE_RINGS[d - 1]) * flat).sum(axis=1) > 0
+        mindist[has_pair] = d
+    return par, tri, mindist
+
+def batch_heuristic(boards, color, pair_weight=PAIR_WEIGHT, triangle_weight=TRIANGLE_WEIGHT, mindist_weight=MINDIST_WEIGHT):
+    """Returns get_heuristic(board, color) for every board in an (N, 8, 8) stack."""
+    opposite = PLAYER2 if color == PLAYER1 else PLAYER1
+    par, tri, mindist = batch_features(boards, color)
+    badpar, badtri, badmindist = batch_features(boards, opposite)
+    return (pair_weight * par + triangle_weight * tri - mindist_weight * mindist) - \
+           (pair_weight * badpar + triangle_weight * badtri - mindist_weight * badmindist)
+
+def child_heuristics(game, moves, pair_weight=PAIR_WEIGHT, triangle_weight=TRIANGLE_WEIGHT, mindist_weight=MINDIST_WEIGHT):
+    """Returns the heuristic of every child of game, scored for the player making the moves."""
+    return batch_heuristic(child_boards(game, moves), game.current_player, pair_weight, triangle_weight, mindist_weight).tolist()
+
+##################
+
+def _build_ring_masks():
+    """Returns, for every cell, the masks of the cells at torus distance 1, 2 and 3 from it."""
+    return [tuple(sum(cell_bit(*divmod(other, BOARD_SIZE)) for other in range(NUM_CELLS) if TORUS_DISTANCE[cell, other] == d)
+                  for d in range(1, MAX_MINDIST))
+            for cell in range(NUM_CELLS)]
+
+def _build_triangle_masks():
+    """Returns, for every cell, the masks of the other two cells of every counted triangle through it."""
+    triangles = [[] for _ in range(NUM_CELLS)]
+    for r in range(BOARD_SIZE):
+        for c in range(BOARD_SIZE):
+            for (dr1, dc1), (dr2, dc2) in TRIANGLE_OFFSETS:
+                cells = [(r, c), ((r + dr1) % BOARD_SIZE, (c + dc1) % BOARD_SIZE), ((r + dr2) % BOARD_SIZE, (c + dc2) % BOARD_SIZE)]
+                for i, (tr, tc) in enumerate(cells):
+                    others = cells[:i] + cells[i + 1:]
+                    triangles[tr * BOARD_SIZE + tc].append(cell_bit(*others[0]) | cell_bit(*others[1]))
+    return triangles
+
+RING_MASKS = _build_ring_masks()            # RING_MASKS[cell][d - 1] for d below MAX_MINDIST
+TRIANGLE_MASKS = _build_triangle_masks()    # TRIANGLE_MASKS[cell] holds 12 two-cell masks
+
+def mask_features(mask):
+    """Returns the features (pairs at distance 1, 2, 3, triangles) of the pieces in mask, from scratch."""
+    return _update_features((0, 0, 0, 0), 0, mask)
+
+def _update_features(features, old, new):
+    """Returns features moved from the pieces in old to the pieces in new, only visiting cells that differ."""
+    ring1, ring2, ring3, tri = features
+    mask = old
+    for cell in iter_bits(old & ~new):
+        mask ^= 1 << cell
+        r1, r2, r3 = RING_MASKS[cell]
+        ring1 -= bin(mask & r1).count('1')
+        ring2 -= bin(mask & r2).count('1')
+        ring3 -= bin(mask & r3).count('1')
+        for others in TRIANGLE_MASKS[cell]:
+            if mask & others == others:
+                tri -= 1
+    for cell in iter_bits(new & ~old):
+        r1, r2, r3 = RING_MASKS[cell]
+        ring1 += bin(mask & r1).count('1')
+        ring2 += bin(mask & r2).count('1')
+        ring3 += bin(mask & r3).count('1')
+        for others in TRIANGLE_MASKS[cell]:
+            if mask & others == others:
+                tri += 1
+        mask |= 1 << cell
+    return ring1, ring2, ring3, tri
+
+def feature_score(features, pair_weight=PAIR_WEIGHT, triangle_weight=TRIANGLE_WEIGHT, mindist_weight=MINDIST_WEIGHT):
+    """Returns the weighted pair / triangle / mindist score of one color's features."""
+    ring1, ring2, ring3, tri = features
+    # every pair of neighbors is one of get_heuristic's pairs, and mindist is the closest non-empty ring
+    mindist = 1 if ring1 else 2 if ring2 else 3 if ring3 else MAX_MINDIST
+    return pair_weight * ring1 + triangle_weight * tri - mindist_weight * mindist
+
+class HeuristicFeatures:
+    def __init__(self, game):
+        self.stack = []     # features before every pushed move, popped on unmake
+        self.reset(game)
+
+    def reset(self, game):
+        """Recomputes every feature of a BitboardGame from scratch."""
+        self.p1_mask = game.p1_mask
+        self.p2_mask = game.p2_mask
+        self.p1_features = mask_features(game.p1_mask)
+        self.p2_features = mask_features(game.p2_mask)
+
+    def push(self, game):
+        """Brings the features up to date with game right after game.make_move."""
+        self.stack.append((self.p1_mask, self.p2_mask, self.p1_features, self.p2_features))
+        if game.p1_mask != self.p1_mask:
+            self.p1_features = _update_features(self.p1_features, self.p1_mask, game.p1_mask)
+            self.p1_mask = game.p1_mask
+        if game.p2_mask != self.p2_mask:
+            self.p2_features = _update_features(self.p2_features, self.p2_mask, game.p2_mask)
+            self.p2_mask = game.p2_mask
+
+    def pop(self):
+        """Undoes the last push, to go with game.unmake_move."""
+        self.p1_mask, self.p2_mask, self.p1_features, self.p2_features = self.stack.pop()
+
+    def heuristic(self, color, pair_weight=PAIR_WEIGHT, triangle_weight=TRIANGLE_WEIGHT, mindist_weight=MINDIST_WEIGHT):
+        """Returns get_heuristic(game, color) for the current position."""
+        own, other = (self.p1_features, self.p2_features) if color == PLAYER1 else (self.p2_features, self.p1_features)
+        return feature_score(own, pair_weight, triangle_weight, mindist_weight) - \
+               feature_score(other, pair_weight, triangle_weight, mindist_weight)
@@ -1,7 +1,9 @@
 import random
 import time
-import copy
 from PushBattle import Game, PLAYER1, PLAYER2, EMPTY, BOARD_SIZE, NUM_PIECES, _torus
+from movegen import legal_moves
+from bitboard import BitboardGame
+from evaluation import HeuristicFeatures
 
 class HybridAgent:
     def __init__(self, player=PLAYER1, depth=3):
@@ -10,25 +12,7 @@ class HybridAgent:
         
     def get_possible_moves(self, game):
         """Returns list of all possible moves in current state."""
-        moves = []
-        current_pieces = game.p1_pieces if game.current_player == PLAYER1 else game.p2_pieces
-        
-        if current_pieces < NUM_PIECES:
-            # placement moves
-            for r in range(BOARD_SIZE):
-                for c in range(BOARD_SIZE):
-                    if game.board[r][c] == EMPTY:
-                        moves.append((r, c))
-        else:
-            # movement moves
-            for r0 in range(BOARD_SIZE):
-                for c0 in range(BOARD_SIZE):
-                    if game.board[r0][c0] == game.current_player:
-                        for r1 in range(BOARD_SIZE):
-                            for c1 in range(BOARD_SIZE):
-                                if game.board[r1][c1] == EMPTY:
-                                    moves.append((r0, c0, r1, c1))
-        return moves
+        return legal_moves(game)
 
     def evaluate(self, game):
         """Simple evaluation function. Higher scores are better for the agent."""
@@ -38,21 +22,15 @@ class HybridAgent:
         else:
             return game.p2_pieces - game.p1_pieces
 
+    def terminal_value(self, game, token):
+        """Returns the score of the position if the move in token ended the game, otherwise None."""
+        winner = game.check_move_winner(token)
+        if winner == EMPTY:
+            return None
+        return float('inf') if winner == self.player else float('-inf')
+
     def minimax(self, game, depth, maximizing_player):
         """Minimax algorithm with alpha-beta pruning."""
-        winner = game.check_winner()
-        if winner != EMPTY:
-            if winner == game.current_player:
-                if maximizing_player:
-                    return float('inf')
-                else:
-                    return float('-inf')
-            else:
-                if maximizing_player:
-                    return float('-inf')
-                else:
-                    return float('inf')
-
         if depth == 2:
             return self.evaluate(game)
         
@@ -60,25 +38,21 @@ class HybridAgent:
         if maximizing_player:
             max_eval = float('-inf')
             for move in possible_moves:
-                new_game = copy.deepcopy(game)
-                if len(move) == 2:
-                    new_game.place_checker(move[0], move[1])
-                else:
-                    new_game.move_checker(move[0], move[1], move[2], move[3])
-
-                eval = self.minimax(new_game, depth - 1, False)
+                token = game.make_move(move)
+                eval = self.terminal_value(game, token)
+                if eval is None:
+                    eval = self.minimax(game, depth - 1, False)
+                game.unmake_move(token)
                 max_eval = max(max_eval, eval)
             return max_eval
         else:
             min_eval = float('inf')
             for move in possible_moves:
-                new_game = copy.deepcopy(game)
-                if len(move) == 2:
-                    new_game.place_checker(move[0], move[1])
-                else:
-                    new_game.move_checker(move[0], move[1], move[2], move[3])
-
-                eval = self.minimax(new_game, depth - 1, True)
+                token = game.make_move(move)
+                eval = self.terminal_value(game, token)
+                if eval is None:
+                    eval = self.minimax(game, depth - 1, True)
+                game.unmake_move(token)
                 min_eval = min(min_eval, eval)
             return min_eval
         
@@ -162,6 +136,8 @@ class HybridAgent:
     
     def get_best_move(self, game):
         """Returns the best move using the Minimax algorithm."""
+        game = BitboardGame.from_game(game)  # search on a private bitboard copy using make/unmake
+        features = HeuristicFeatures(game)
         possible_moves = self.get_possible_moves(game)
         best_move = None
         best_value = float('-inf')
@@ -170,18 +146,16 @@ class HybridAgent:
         best_heuristic_value = float('-inf')
 
         for move in possible_moves:
-            new_game = copy.deepcopy(game)
-            if len(move) == 2:
-                new_game.place_checker(move[0], move[1])
-            else:
-                new_game.move_checker(move[0], move[1], move[2], move[3])
-
-            move_value = self.minimax(new_game, self.depth - 1, game.current_player == self.player)
+            token = game.make_move(move)
+            move_value = self.terminal_value(game, token)
+            if move_value is None:
+                move_value = self.minimax(game, self.depth - 1, game.current_player == self.player)
 
-            if game.current_player == PLAYER1:
-                heuristic_value = self.get_heuristic(new_game, 1)
-            else:
-                heuristic_value = self.get_heuristic(new_game, -1)
+            # the heuristic is scored for the player who just moved, same as get_heuristic without mindist
+            features.push(game)
+            heuristic_value = features.heuristic(token[2], pair_weight=3, triangle_weight=1, mindist_weight=0)
+            features.pop()
+            game.unmake_move(token)
             
             if heuristic_value > best_heuristic_value:
                 best_heuristic_move = move
@@ -1,34 +1,46 @@
 import random
 import time
-import copy
 from PushBattle import Game, PLAYER1, PLAYER2, EMPTY, BOARD_SIZE, NUM_PIECES, _torus
+from movegen import legal_moves, is_placement, encode_move, decode_move, NO_MOVE
+from bitboard import BitboardGame
+from transposition import TranspositionTable, EXACT, LOWER, UPPER
+from deadline import Deadline, SearchTimeout
+from move_ordering import MoveOrderer
+from symmetry import unique_moves
+from threats import ThreatIndex
+from threat_solver import ThreatSpaceSolver
+from evaluation import child_heuristics, PAIR_WEIGHT, TRIANGLE_WEIGHT, MINDIST_WEIGHT
+
+TACTICS_SHARE = 0.25    # Share of the time limit the forced-win solver may use before the full search
+THREAT_DEPTH = 4        # Shallowest remaining depth at which minimax asks the threat index (shallower nodes find a win as fast by searching)
 
 class HybridAgent2:
-    def __init__(self, player=PLAYER1, depth=3):
+    def __init__(self, player=PLAYER1, depth=3, tt_mb=64, time_limit=None, move_ordering=True, symmetry_pruning=True, tactics=True,
+                 solved_positions=None, opening_book=None, pair_weight=PAIR_WEIGHT, triangle_weight=TRIANGLE_WEIGHT, mindist_weight=MINDIST_WEIGHT):
         self.player = player  # the agent's player
-        self.depth = depth    # depth for the Minimax search
+        self.depth = depth    # deepest iteration of the Minimax search
+        self.tt = TranspositionTable(tt_mb)  # transposition table shared across all moves of the game
+        self.time_limit = time_limit  # seconds per move, None to always finish self.depth
+        self.deadline = Deadline()
+        self.orderer = MoveOrderer() if move_ordering else None
+        self.root_depth = depth  # depth of the iteration being searched, to turn depth into ply
+        self.symmetry_pruning = symmetry_pruning  # search only one of the root moves that are symmetric to each other
+        self.solver = ThreatSpaceSolver() if tactics else None  # looks for forced wins before the full search
+        self.solved_positions = solved_positions  # pn_solver.SolvedPositions consulted before searching, or None
+        self.opening_book = opening_book  # opening_book.OpeningBook consulted before searching, or None
+        self.weights = (pair_weight, triangle_weight, mindist_weight)  # par / tri / mindist coefficients of the heuristic
+        self.threat_index = None  # ThreatIndex following the position being searched
         
     def get_possible_moves(self, game):
         """Returns list of all possible moves in current state."""
-        moves = []
-        current_pieces = game.p1_pieces if game.current_player == PLAYER1 else game.p2_pieces
-        
-        if current_pieces < NUM_PIECES:
-            # placement moves
-            for r in range(BOARD_SIZE):
-                for c in range(BOARD_SIZE):
-                    if game.board[r][c] == EMPTY:
-                        moves.append((r, c))
-        else:
-            # movement moves
-            for r0 in range(BOARD_SIZE):
-                for c0 in range(BOARD_SIZE):
-                    if game.board[r0][c0] == game.current_player:
-                        for r1 in range(BOARD_SIZE):
-                            for c1 in range(BOARD_SIZE):
-                                if game.board[r1][c1] == EMPTY:
-                                    moves.append((r0, c0, r1, c1))
-        return moves
+        return legal_moves(game)
+
+    def get_root_moves(self, game):
+        """Returns the moves to search at the root, keeping one move of every group of symmetric moves."""
+        possible_moves = self.get_possible_moves(game)
+        if self.symmetry_pruning:
+            possible_moves = unique_moves(game, possible_moves)
+        return possible_moves
 
     def evaluate(self, game):
         """Simple evaluation function. Higher scores are better for the agent."""
@@ -38,167 +50,106 @@ class HybridAgent2:
         else:
             return game.p2_pieces - game.p1_pieces
 
-    def minimax(self, game, depth, maximizing_player):
-        """Minimax algorithm with alpha-beta pruning."""
-        winner = game.check_winner()
-        if winner != EMPTY:
-            if winner == game.current_player:
-                if maximizing_player:
-                    return float('inf')
-                else:
-                    return float('-inf')
-            else:
-                if maximizing_player:
-                    return float('-inf')
-                else:
-                    return float('inf')
+    def terminal_value(self, game, token):
+        """Returns the score of the position if the move in token ended the game, otherwise None."""
+        winner = game.check_move_winner(token)
+        if winner == EMPTY:
+            return None
+        return float('inf') if winner == self.player else float('-inf')
+
+    def make_move(self, game, move, depth):
+        """Plays move on the searched game and, when the child at depth will query it, on the threat index."""
+        token = game.make_move(move)
+        if depth >= THREAT_DEPTH:
+            self.threat_index.push(token)
+        return token
 
+    def unmake_move(self, game, token, depth):
+        """Takes back a move played by make_move with the same depth."""
+        if depth >= THREAT_DEPTH:
+            self.threat_index.pop()
+        game.unmake_move(token)
+
+    def minimax(self, game, depth, maximizing_player, alpha=float('-inf'), beta=float('inf')):
+        """Minimax algorithm with alpha-beta pruning."""
+        self.deadline.check()
         if depth == 1:
             return self.evaluate(game)
+
+        # a player who can win with one move wins here: the same value the search below would find, without it
+        if depth >= THREAT_DEPTH and self.threat_index.has_immediate_win(game.current_player):
+            return float('inf') if game.current_player == self.player else float('-inf')
+
+        # positions reached through a different move order were already searched
+        key = game.zobrist_key
+        entry = self.tt.probe(key)
+        tt_move = None
+        if entry is not None:
+            tt_depth, tt_flag, tt_value, tt_code = entry
+            if tt_depth >= depth:
+                if tt_flag == EXACT:
+                    return tt_value
+                elif tt_flag == LOWER:
+                    alpha = max(alpha, tt_value)
+                else:
+                    beta = min(beta, tt_value)
+                if beta <= alpha:
+                    return tt_value
+            tt_move = decode_move(tt_code, is_placement(game))
+        alpha_orig, beta_orig = alpha, beta
         
         possible_moves = self.get_possible_moves(game)
+        if self.orderer is not None:
+            possible_moves = self.orderer.order(game, possible_moves, self.root_depth - depth, tt_move)
+        best_move = None
         if maximizing_player:
             max_eval = float('-inf')
             for move in possible_moves:
-                if len(move) == 2:
-                    # make move
-                    changes = []
-                    changes.append((move[0], move[1], game.board[move[0]][move[1]]))
-                    game.board[move[0]][move[1]] = game.current_player
-                    if game.current_player == PLAYER1:
-                        game.p1_pieces += 1
-                    else:
-                        game.p2_pieces += 1
-                    
-                    r0, c0 = (move[0], move[1])
-                    dirs = [(-1, -1), (-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1)]
-                    for dr, dc in dirs:
-                        # (r1, c1) is a 1-tile (immediate) neighbor of (r0, c0) in the direction (dr, dc)
-                        r1, c1 = _torus(r0 + dr, c0 + dc)
-                        if game.board[r1][c1] != EMPTY:
-                            # (r2, c2) is a 2-tile (secondary) neighbor of (r0, c0) in the direction (dr, dc)
-                            r2, c2 = _torus(r1 + dr, c1 + dc)
-                            if game.board[r2][c2] == EMPTY:
-                                changes.append((r2, c2, game.board[r2][c2]))
-                                changes.append((r1, c1, game.board[r1][c1]))
-                                game.board[r2][c2], game.board[r1][c1] = game.board[r1][c1], game.board[r2][c2]
-                    game.current_player *= -1
-
-                    # evaluate
-                    eval = self.minimax(game, depth - 1, False)
-                    max_eval = max(max_eval, eval)
-
-                    # undo move 
-                    for change in changes:
-                        game.board[change[0]][change[1]] = change[2]
-                    game.current_player *= -1
-                    if game.current_player == PLAYER1:
-                        game.p1_pieces -= 1
-                    else:
-                        game.p2_pieces -= 1
-                else:
-                    # make move
-                    changes = []
-                    changes.append((move[0], move[1], game.board[move[0]][move[1]]))
-                    changes.append((move[2], move[3], game.board[move[2]][move[3]]))
-                    game.board[move[0]][move[1]] = EMPTY
-                    game.board[move[2]][move[3]] = game.current_player
-                    
-                    r0, c0 = (move[2], move[3])
-                    dirs = [(-1, -1), (-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1)]
-                    
-                    for dr, dc in dirs:
-                        # (r1, c1) is a 1-tile (immediate) neighbor of (r0, c0) in the direction (dr, dc)
-                        r1, c1 = _torus(r0 + dr, c0 + dc)
-                        if game.board[r1][c1] != EMPTY:
-                            # (r2, c2) is a 2-tile (secondary) neighbor of (r0, c0) in the direction (dr, dc)
-                            r2, c2 = _torus(r1 + dr, c1 + dc)
-                            if game.board[r2][c2] == EMPTY:
-                                changes.append((r2, c2, game.board[r2][c2]))
-                                changes.append((r1, c1, game.board[r1][c1]))
-                                game.board[r2][c2], game.board[r1][c1] = game.board[r1][c1], game.board[r2][c2]
-                    game.current_player *= -1
+                token = self.make_move(game, move, depth - 1)
 
-                    # evaluate
-                    eval = self.minimax(game, depth - 1, False)
-                    max_eval = max(max_eval, eval)
+                # evaluate
+                eval = self.terminal_value(game, token)
+                if eval is None:
+                    eval = self.minimax(game, depth - 1, False, alpha, beta)
+                if eval > max_eval or best_move is None:
+                    max_eval = eval
+                    best_move = move
 
-                    # undo move 
-                    for change in changes:
-                        game.board[change[0]][change[1]] = change[2]
-                    game.current_player *= -1
-            return max_eval
+                self.unmake_move(game, token, depth - 1)
+                alpha = max(alpha, eval)
+                if beta <= alpha:
+                    self.record_cutoff(move, depth)
+                    break  # beta cut-off
+            value = max_eval
         else:
             min_eval = float('inf')
             for move in possible_moves:
-                if len(move) == 2:
-                    # make move
-                    changes = []
-                    changes.append((move[0], move[1], game.board[move[0]][move[1]]))
-                    game.board[move[0]][move[1]] = game.current_player
-                    if game.current_player == PLAYER1:
-                        game.p1_pieces += 1
-                    else:
-                        game.p2_pieces += 1
-                    
-                    r0, c0 = (move[0], move[1])
-                    dirs = [(-1, -1), (-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1)]
-                    for dr, dc in dirs:
-                        # (r1, c1) is a 1-tile (immediate) neighbor of (r0, c0) in the direction (dr, dc)
-                        r1, c1 = _torus(r0 + dr, c0 + dc)
-                        if game.board[r1][c1] != EMPTY:
-                            # (r2, c2) is a 2-tile (secondary) neighbor of (r0, c0) in the direction (dr, dc)
-                            r2, c2 = _torus(r1 + dr, c1 + dc)
-                            if game.board[r2][c2] == EMPTY:
-                                changes.append((r2, c2, game.board[r2][c2]))
-                                changes.append((r1, c1, game.board[r1][c1]))
-                                game.board[r2][c2], game.board[r1][c1] = game.board[r1][c1], game.board[r2][c2]
-                    game.current_player *= -1
-
-                    # evaluate
-                    eval = self.minimax(game, depth - 1, True)
-                    min_eval = min(min_eval, eval)
+                token = self.make_move(game, move, depth - 1)
 
-                    # undo move 
-                    for change in changes:
-                        game.board[change[0]][change[1]] = change[2]
-                    game.current_player *= -1
-                    if game.current_player == PLAYER1:
-                        game.p1_pieces -= 1
-                    else:
-                        game.p2_pieces -= 1
-                else:
-                    # make move
-                    changes = []
-                    changes.append((move[0], move[1], game.board[move[0]][move[1]]))
-                    changes.append((move[2], move[3], game.board[move[2]][move[3]]))
-                    game.board[move[0]][move[1]] = EMPTY
-                    game.board[move[2]][move[3]] = game.current_player
-                    
-                    r0, c0 = (move[2], move[3])
-                    dirs = [(-1, -1), (-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1)]
-                    
-                    for dr, dc in dirs:
-                        # (r1, c1) is a 1-tile (immediate) neighbor of (r0, c0) in the direction (dr, dc)
-                        r1, c1 = _torus(r0 + dr, c0 + dc)
-                        if game.board[r1][c1] != EMPTY:
-                            # (r2, c2) is a 2-tile (secondary) neighbor of (r0, c0) in the direction (dr, dc)
-                            r2, c2 = _torus(r1 + dr, c1 + dc)
-                            if game.board[r2][c2] == EMPTY:
-                                changes.append((r2, c2, game.board[r2][c2]))
-                                changes.append((r1, c1, game.board[r1][c1]))
-                                game.board[r2][c2], game.board[r1][c1] = game.board[r1][c1], game.board[r2][c2]
-                    game.current_player *= -1
+                # evaluate
+                eval = self.terminal_value(game, token)
+                if eval is None:
+                    eval = self.minimax(game, depth - 1, True, alpha, beta)
+                if eval < min_eval or best_move is None:
+                    min_eval = eval
+                    best_move = move
 
-                    # evaluate
-                    eval = self.minimax(game, depth - 1, True)
-                    min_eval = min(min_eval, eval)
+                self.unmake_move(game, token, depth - 1)
+                beta = min(beta, eval)
+                if beta <= alpha:
+                    self.record_cutoff(move, depth)
+                    break  # alpha cut-off
+            value = min_eval
 
-                    # undo move 
-                    for change in changes:
-                        game.board[change[0]][change[1]] = change[2]
-                    game.current_player *= -1
-            return min_eval
+        # the value is only a bound if it fell outside the window
+        if value <= alpha_orig:
+            flag = UPPER
+        elif value >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt.store(key, depth, flag, value, encode_move(best_move))
+        return value
         
     def get_heuristic(self, game, color):
         """Returns the heuristic value of a position."""
@@ -277,123 +228,139 @@ class HybridAgent2:
                 dx = min(abs(x[0] - y[0]), 8 - abs(x[0] - y[0]))
                 dy = min(abs(x[1] - y[1]), 8 - abs(x[1] - y[1]))
                 badmindist = min(badmindist, max(dx, dy))
-        return (9*par + 3 * tri - mindist) - (9 * badpar + 3*badtri - badmindist)
+        pair_weight, triangle_weight, mindist_weight = self.weights
+        return (pair_weight*par + triangle_weight * tri - mindist_weight * mindist) - (pair_weight * badpar + triangle_weight*badtri - mindist_weight * badmindist)
     
+    def record_cutoff(self, move, depth):
+        """Feeds a cut-off move to the killer and history tables."""
+        if self.orderer is not None:
+            self.orderer.record_cutoff(move, self.root_depth - depth, depth)
+
+    def search_root(self, game, possible_moves, depth):
+        """Returns the minimax value of every root move searched to depth, stopping at the first winning move."""
+        self.root_depth = depth
+        self.threat_index = ThreatIndex(game)
+        move_values = []
+        for move in possible_moves:
+            token = self.make_move(game, move, depth - 1)
+            move_value = self.terminal_value(game, token)
+            if move_value is None:
+                move_value = self.minimax(game, depth - 1, False)
+            self.unmake_move(game, token, depth - 1)
+            move_values.append(move_value)
+            if move_value == float('inf'):
+                break
+        # moves after a winning move are left unknown
+        return move_values + [0] * (len(possible_moves) - len(move_values))
+
+    def drop_losing_moves(self, possible_moves, move_values, heuristic_values):
+        """Returns the moves (with their values) that the search did not prove to be losing, or all of them if every move loses.
+        Without this the heuristic fallback could pick a move the search has already seen lose."""
+        keep = [i for i, move_value in enumerate(move_values) if move_value != float('-inf')] or range(len(possible_moves))
+        return [possible_moves[i] for i in keep], [move_values[i] for i in keep], [heuristic_values[i] for i in keep]
+
+    def predict_reply(self, game):
+        """Returns the opponent's most likely reply: the best move the search stored for game, else the best heuristic move."""
+        entry = self.tt.probe(game.zobrist_key)
+        if entry is not None and entry[3] != NO_MOVE:
+            return decode_move(entry[3], is_placement(game))
+        possible_moves = self.get_possible_moves(game)
+        heuristic_values = child_heuristics(game, possible_moves, *self.weights)
+        return possible_moves[heuristic_values.index(max(heuristic_values))]
+
+    def ponder(self, game, deadline):
+        """Searches the position after the predicted reply to game until deadline stops, filling the transposition table."""
+        game = BitboardGame.from_game(game)
+        token = game.make_move(self.predict_reply(game))
+        if game.check_move_winner(token) != EMPTY:
+            return
+        self.deadline = deadline
+        possible_moves = self.get_root_moves(game)
+        for depth in range(2, self.depth + 1):
+            try:
+                self.search_root(game.copy(), possible_moves, depth)
+            except SearchTimeout:
+                break
+        self.deadline = Deadline()
+
     def get_best_move(self, game):
         """Returns the best move using the Minimax algorithm."""
-        possible_moves = self.get_possible_moves(game)
-        best_move = None
-        best_value = float('-inf')
-        
-        best_heuristic_move = None
-        best_heuristic_value = float('-inf')
+        game = BitboardGame.from_game(game)  # search on a private bitboard copy using make/unmake
+        self.tt.new_search()
+        if self.orderer is not None:
+            self.orderer.new_search()
+        self.deadline = Deadline(self.time_limit)
+        possible_moves = self.get_root_moves(game)
 
-        for move in possible_moves:
-            if len(move) == 2:
-                # make move
-                changes = []
-                changes.append((move[0], move[1], game.board[move[0]][move[1]]))
-                game.board[move[0]][move[1]] = game.current_player
-                if game.current_player == PLAYER1:
-                    game.p1_pieces += 1
-                else:
-                    game.p2_pieces += 1
-                
-                r0, c0 = (move[0], move[1])
-                dirs = [(-1, -1), (-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1)]
-                for dr, dc in dirs:
-                    # (r1, c1) is a 1-tile (immediate) neighbor of (r0, c0) in the direction (dr, dc)
-                    r1, c1 = _torus(r0 + dr, c0 + dc)
-                    if game.board[r1][c1] != EMPTY:
-                        # (r2, c2) is a 2-tile (secondary) neighbor of (r0, c0) in the direction (dr, dc)
-                        r2, c2 = _torus(r1 + dr, c1 + dc)
-                        if game.board[r2][c2] == EMPTY:
-                            changes.append((r2, c2, game.board[r2][c2]))
-                            changes.append((r1, c1, game.board[r1][c1]))
-                            game.board[r2][c2], game.board[r1][c1] = game.board[r1][c1], game.board[r2][c2]
-                game.current_player *= -1
+        # positions from the opening book or solved offline are answered right away
+        if self.opening_book is not None:
+            book_move = self.opening_book.lookup(game)
+            if book_move is not None:
+                self.deadline = Deadline()
+                return book_move
+        if self.solved_positions is not None:
+            solved = self.solved_positions.lookup(game)
+            if solved is not None and solved[1] is not None:
+                self.deadline = Deadline()
+                return solved[1]
 
-                # evaluate
-                move_value = self.minimax(game, self.depth - 1, False)
+        # tactics first: take a win on the spot, and only consider the moves that stop the opponent's
+        threat_index = ThreatIndex(game)
+        winning_moves = threat_index.winning_moves(game.current_player)
+        if winning_moves:
+            self.deadline = Deadline()
+            return winning_moves[0]
+        if threat_index.has_immediate_win(PLAYER2 if game.current_player == PLAYER1 else PLAYER1):
+            possible_moves = threat_index.blocking_moves(possible_moves) or possible_moves
+        elif self.solver is not None:
+            # a forced win through threats makes the full search unnecessary
+            solver_time = None if self.time_limit is None else self.time_limit * TACTICS_SHARE
+            pv = self.solver.solve(game, Deadline(solver_time))
+            if pv is not None:
+                self.deadline = Deadline()
+                return pv[0]
 
-                heuristic_value = self.get_heuristic(game, game.current_player * -1)
-                
-                if heuristic_value > best_heuristic_value:
-                    best_heuristic_move = move
-                    best_heuristic_value = heuristic_value
-                elif heuristic_value == best_heuristic_value:
-                    random.seed(time.time())
-                    if random.randint(1,2) % 2 == 0:
-                        best_heuristic_move = move
-                        best_heuristic_value = heuristic_value
-                
-                if move_value > best_value:
-                    best_value = move_value
-                    best_move = move
-                elif move_value == best_value:
-                    random.seed(time.time())
-                    if random.randint(1,2) % 2 == 0:
-                        best_value = move_value
-                        best_move = move
+        # all children are scored in one batch; equal to get_heuristic on each child
+        heuristic_values = child_heuristics(game, possible_moves, *self.weights)
 
-                # undo move 
-                for change in changes:
-                    game.board[change[0]][change[1]] = change[2]
-                game.current_player *= -1
-                if game.current_player == PLAYER1:
-                    game.p1_pieces -= 1
-                else:
-                    game.p2_pieces -= 1
-            else:
-                # make move
-                changes = []
-                changes.append((move[0], move[1], game.board[move[0]][move[1]]))
-                changes.append((move[2], move[3], game.board[move[2]][move[3]]))
-                game.board[move[0]][move[1]] = EMPTY
-                game.board[move[2]][move[3]] = game.current_player
-                
-                r0, c0 = (move[2], move[3])
-                dirs = [(-1, -1), (-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1)]
-                
-                for dr, dc in dirs:
-                    # (r1, c1) is a 1-tile (immediate) neighbor of (r0, c0) in the direction (dr, dc)
-                    r1, c1 = _torus(r0 + dr, c0 + dc)
-                    if game.board[r1][c1] != EMPTY:
-                        # (r2, c2) is a 2-tile (secondary) neighbor of (r0, c0) in the direction (dr, dc)
-                        r2, c2 = _torus(r1 + dr, c1 + dc)
-                        if game.board[r2][c2] == EMPTY:
-                            changes.append((r2, c2, game.board[r2][c2]))
-                            changes.append((r1, c1, game.board[r1][c1]))
-                            game.board[r2][c2], game.board[r1][c1] = game.board[r1][c1], game.board[r2][c2]
-                game.current_player *= -1
+        # iterative deepening: keep the move values of the last iteration that finished in time
+        move_values = [0] * len(possible_moves)
+        for depth in range(2, self.depth + 1):
+            try:
+                # an interrupted search leaves its moves on the board, so every iteration gets its own copy
+                move_values = self.search_root(game.copy(), possible_moves, depth)
+            except SearchTimeout:
+                break
+            if float('inf') in move_values or max(move_values) == float('-inf'):
+                break   # a win is found or every move loses, searching deeper cannot change the choice
+        self.deadline = Deadline()
 
-                # evaluate
-                move_value = self.minimax(game, self.depth - 1, False)
+        possible_moves, move_values, heuristic_values = self.drop_losing_moves(possible_moves, move_values, heuristic_values)
 
-                heuristic_value = self.get_heuristic(game, game.current_player * -1)
-                
-                if heuristic_value > best_heuristic_value:
+        best_move = None
+        best_value = float('-inf')
+        
+        best_heuristic_move = None
+        best_heuristic_value = float('-inf')
+
+        for move, move_value, heuristic_value in zip(possible_moves, move_values, heuristic_values):
+            if heuristic_value > best_heuristic_value:
+                best_heuristic_move = move
+                best_heuristic_value = heuristic_value
+            elif heuristic_value == best_heuristic_value:
+                random.seed(time.time())
+                if random.randint(1,2) % 2 == 0:
                     best_heuristic_move = move
                     best_heuristic_value = heuristic_value
-                elif heuristic_value == best_heuristic_value:
-                    random.seed(time.time())
-                    if random.randint(1,2) % 2 == 0:
-                        best_heuristic_move = move
-                        best_heuristic_value = heuristic_value
-                
-                if move_value > best_value:
+            
+            if move_value > best_value:
+                best_value = move_value
+                best_move = move
+            elif move_value == best_value:
+                random.seed(time.time())
+                if random.randint(1,2) % 2 == 0:
                     best_value = move_value
                     best_move = move
-                elif move_value == best_value:
-                    random.seed(time.time())
-                    if random.randint(1,2) % 2 == 0:
-                        best_value = move_value
-                        best_move = move
-
-                # undo move 
-                for change in changes:
-                    game.board[change[0]][change[1]] = change[2]
-                game.current_player *= -1
 
         # use heuristic to find the best move
         if best_value < float('inf'):
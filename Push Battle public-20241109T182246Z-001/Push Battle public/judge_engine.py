@@ -1,7 +1,9 @@
 import numpy as np
 import requests
 import time
+import uuid
 from PushBattle import Game, PLAYER1, PLAYER2, EMPTY, BOARD_SIZE, NUM_PIECES, _torus, chess_notation_to_array, array_to_chess_notation
+from movegen import legal_moves
 
 import random
 class RandomAgent:
@@ -10,25 +12,7 @@ class RandomAgent:
     
     def get_possible_moves(self, game):
         """Returns list of all possible moves in current state."""
-        moves = []
-        current_pieces = game.p1_pieces if game.current_player == PLAYER1 else game.p2_pieces
-        
-        if current_pieces < NUM_PIECES:
-            # placement moves
-            for r in range(BOARD_SIZE):
-                for c in range(BOARD_SIZE):
-                    if game.board[r][c] == EMPTY:
-                        moves.append((r, c))
-        else:
-            # movement moves
-            for r0 in range(BOARD_SIZE):
-                for c0 in range(BOARD_SIZE):
-                    if game.board[r0][c0] == game.current_player:
-                        for r1 in range(BOARD_SIZE):
-                            for c1 in range(BOARD_SIZE):
-                                if game.board[r1][c1] == EMPTY:
-                                    moves.append((r0, c0, r1, c1))
-        return moves
+        return legal_moves(game)
         
     def get_best_move(self, game):
         """Returns a random valid move."""
@@ -36,6 +20,7 @@ class RandomAgent:
         return random.choice(possible_moves)
 
 TIMEOUT = 4 # time for each move
+RANDOM_MOVES = 5 # random moves each player may fall back on before forfeiting
 
 class Agent:
     def __init__(self, participant, agent_name):
@@ -44,13 +29,25 @@ class Agent:
         self.latency = None
 
 class Judge:
-    def __init__(self, p1_url, p2_url):
+    def __init__(self, p1_url, p2_url, strict_fallback=False):
         self.p1_url = p1_url
         self.p2_url = p2_url
         self.game = Game()
         self.p1_agent = None
         self.p2_agent = None
         self.game_str = ""
+        self.game_id = uuid.uuid4().hex  # sent with every request so the players can keep a session per game
+        self.verbose = True  # print the game as it is played
+        self.random_moves = {PLAYER1: RANDOM_MOVES, PLAYER2: RANDOM_MOVES}  # random fallback moves left for each player
+        # False reproduces the competition judge: the random fallback move is handed to handle_move in chess notation,
+        # which drops it (the turn passes, logged as 'r'), and a placement-length move in the movement phase raises.
+        # True plays the fallback move (logged as '-xxr') and makes a placement-length movement move a forfeit.
+        self.strict_fallback = strict_fallback
+
+    def log(self, *args):
+        """ Prints a progress message when the judge is verbose """
+        if self.verbose:
+            print(*args)
 
     def check_latency(self):
         """Check latency for both players and create their agents"""
@@ -88,13 +85,39 @@ class Judge:
 
         return True
 
-    def start_game(self):
-        """ Start the game for both players """
-        starting_data = {
+    def start_data(self):
+        """ Data sent to the players with /start """
+        return {
             "game": self.game.to_dict(),
             "board": self.game.board.tolist(),
             "max_latency": TIMEOUT,
+            "game_id": self.game_id,
         }
+
+    def move_data(self, attempt_number, p1_random, p2_random):
+        """ Data sent to the current player with /move """
+        return {
+            "game": self.game.to_dict(),
+            "board": self.game.board.tolist(),
+            "turn_count": self.game.turn_count,
+            "attempt_number": attempt_number,
+            "game_id": self.game_id,
+            "random_attempts": p1_random if self.game.current_player == PLAYER1 else p2_random,
+        }
+
+    def end_data(self, winner):
+        """ Data sent to the players with /end """
+        return {
+            "game": self.game.to_dict(),
+            "board": self.game.board.tolist(),
+            "turn_count": self.game.turn_count,
+            "winner": int(winner),
+            "game_id": self.game_id,
+        }
+
+    def start_game(self):
+        """ Start the game for both players """
+        starting_data = self.start_data()
         # Start p1
         try:
             starting_data['first_turn'] = True
@@ -114,21 +137,14 @@ class Judge:
 
     def receive_move(self, attempt_number, p1_random, p2_random):
         """ Receive moves from each player """
-        move_data = {
-                    "game": self.game.to_dict(),
-                    "board": self.game.board.tolist(),
-                    "turn_count": self.game.turn_count,
-                    "attempt_number": attempt_number,
-                }
+        move_data = self.move_data(attempt_number, p1_random, p2_random)
         try:
             if self.game.current_player == PLAYER1:
-                move_data["random_attempts"] = p1_random
                 start_time = time.time()
                 response = requests.post(f"{self.p1_url}/move", json=move_data, timeout=TIMEOUT)
                 end_time = time.time()
                 self.p1_agent.latency = (end_time-start_time)
             else:
-                move_data["random_attempts"] = p2_random
                 start_time = time.time()
                 response = requests.post(f"{self.p2_url}/move", json=move_data, timeout=TIMEOUT)
                 end_time = time.time()
@@ -155,16 +171,11 @@ class Judge:
 
     def end_game(self, winner):
         """ End the game for both players """
-        end_data = {
-                    "game": self.game.to_dict(),
-                    "board": self.game.board.tolist(),
-                    "turn_count": self.game.turn_count,
-                    "winner": int(winner)
-                }
+        end_data = self.end_data(winner)
         try:
             response = requests.post(f"{self.p1_url}/end", json=end_data, timeout=TIMEOUT)
             response = requests.post(f"{self.p2_url}/end", json=end_data, timeout=TIMEOUT)
-            print(f"Winner: {'PLAYER1' if winner == PLAYER1 else 'PLAYER2'}")
+            self.log("Draw" if winner == EMPTY else f"Winner: {'PLAYER1' if winner == PLAYER1 else 'PLAYER2'}")
         except (requests.RequestException, requests.Timeout):
             return False
 
@@ -172,17 +183,17 @@ class Judge:
         """ Places the move if valid and returns True or False """
 
         if not isinstance(move, (list, tuple)) or len(move) < 2:
-                print(f"Invalid move format by Player {'P1' if game.current_player == PLAYER1 else 'P2'}")
+                self.log(f"Invalid move format by Player {'P1' if game.current_player == PLAYER1 else 'P2'}")
                 # return False
                 return "forfeit"
 
-        if len(move) != 2 and len(move) != 4:
-            print(f"Invalid move format by Player {'P1' if game.current_player == PLAYER1 else 'P2'}")
+        if len(move) != 2 and len(move) != 4 or self.strict_fallback and game.turn_count >= 17 and len(move) != 4:
+            self.log(f"Invalid move format by Player {'P1' if game.current_player == PLAYER1 else 'P2'}")
             # return False
             return "forfeit"
 
         chess_move = array_to_chess_notation(move)
-        print(f"{game.current_player}'s move is: {move} or {chess_move}")
+        self.log(f"{game.current_player}'s move is: {move} or {chess_move}")
 
         try:
             # Convert move elements to integers if they aren't already
@@ -192,14 +203,14 @@ class Judge:
                 if game.is_valid_placement(move[0], move[1]):
                     game.place_checker(move[0], move[1])
                 else:
-                    print(f"Invalid placement by {game.current_player}")
+                    self.log(f"Invalid placement by {game.current_player}")
                     # return False
                     return "forfeit"
             else:
                 if game.is_valid_move(move[0], move[1], move[2], move[3]):
                     game.move_checker(move[0], move[1], move[2], move[3])
                 else:
-                    print(f"Invalid move by {game.current_player}")
+                    self.log(f"Invalid move by {game.current_player}")
                     # return False
                     return "forfeit"
 
@@ -209,6 +220,90 @@ class Judge:
         except (requests.RequestException, requests.Timeout):
             return False
             
+    def start_turn(self, max_turns=None):
+        """ Advances to the next turn; returns False instead once max_turns turns have been played """
+        if max_turns is not None and self.game.turn_count >= max_turns:
+            self.log("Game ended in a draw")
+            return False
+
+        self.game.turn_count += 1
+        self.log(f"Turn {self.game.turn_count}")
+
+        # movement
+        self.log("Sending move to:", self.game.current_player)
+        return True
+
+    def finish_turn(self, attempt):
+        """ Settles the turn after the player's attempts (True, False or "forfeit"); returns the winner or None """
+        opponent = PLAYER2 if self.game.current_player == PLAYER1 else PLAYER1
+
+        # checks if the attempt was a forfeit
+        if attempt == "forfeit":
+            # indicates forfeit
+            self.game_str += f"-q"
+            return opponent
+
+        if not attempt:
+            # plays a random move
+            self.log(f"Player {'PLAYER1' if self.game.current_player == PLAYER1 else 'PLAYER2'} failed to make a valid move.")
+
+            if self.random_moves[self.game.current_player] > 0:
+                move = RandomAgent(player=self.game.current_player).get_best_move(self.game)
+                if not self.strict_fallback:
+                    move = array_to_chess_notation(move)
+                self.handle_move(self.game, move)
+                # tag that it was random
+                self.game_str += 'r'
+
+                self.random_moves[self.game.current_player] -= 1
+                self.log(f"{'P1' if self.game.current_player == PLAYER1 else 'P2'} has {self.random_moves[self.game.current_player]} random moves left")
+            else:
+                # current player forfeits
+                self.log(f"Player {self.game.current_player} has no random moves left. Forfeiting.")
+                # indicates forfeit
+                self.game_str += f"-q"
+                return opponent
+
+        if self.verbose:
+            self.game.display_board()
+
+        # check for a winner
+        winner = self.game.check_winner()
+        if winner != EMPTY:
+            return winner
+
+        # swaps player
+        self.game.current_player *= -1
+
+        self.log()
+        return None
+
+    def play_game(self, max_turns=None):
+        """ Plays the game to the end and returns the winner (EMPTY for a draw after max_turns turns) """
+        # random moves left for p1 and p2
+        self.random_moves = {PLAYER1: RANDOM_MOVES, PLAYER2: RANDOM_MOVES}
+
+        # game loop
+        winner = None
+        while winner is None:
+            if not self.start_turn(max_turns):
+                winner = EMPTY
+                break
+
+            # first move attempt
+            self.log("First move attempt")
+            attempt = self.receive_move(1, self.random_moves[PLAYER1], self.random_moves[PLAYER2])
+
+            if not attempt:
+                # second move attempt
+                self.log("Second move attempt")
+                attempt = self.receive_move(2, self.random_moves[PLAYER1], self.random_moves[PLAYER2])
+
+            winner = self.finish_turn(attempt)
+
+        self.end_game(winner)
+        self.log("Game String:", self.game_str)
+        return winner
 
 def main():
     # creating judge
@@ -231,108 +326,8 @@ def main():
         print("Failed to start game")
         return
 
-    # random moves left for p1 and p2
-    p1_random = 5
-    p2_random = 5
-        
-    # game loop
-    while True:
-        judge.game.turn_count += 1
-        print(f"Turn {judge.game.turn_count}")
-
-        # movement
-        print("Sending move to:", judge.game.current_player)
-
-        # first move attempt
-        print("First move attempt")
-        first_attempt = judge.receive_move(1, p1_random, p2_random)
-
-        # checks if the first attempt was a forfeit
-        if first_attempt == "forfeit":
-            player = 1 if judge.game.current_player == 1 else 2
-
-            judge.game_str += f"-q"
-
-            winner = 1 if player == 2 else -1
-
-            judge.end_game(winner)
-            print("Game String:", judge.game_str)
-            break
-
-        # if not judge.send_move(1, p1_random, p2_random):
-        if not first_attempt:
-            print("Second move attempt")
-
-            second_attempt = judge.receive_move(2, p1_random, p2_random)
-            if second_attempt == "forfeit":
-                player = 1 if judge.game.current_player == 1 else 2
-                # indicates forfeit
-                judge.game_str += f"-q"
-
-                winner = 1 if player == 2 else -1
-
-                judge.end_game(winner)
-                print("Game String:", judge.game_str)
-                break
-
-            # second move attempt
-            if not second_attempt:
-                # plays a random move
-                print(f"Player {'PLAYER1' if judge.game.current_player == PLAYER1 else 'PLAYER2'} failed to make a valid move.")
-
-                current_random_moves = p1_random if judge.game.current_player == PLAYER1 else p2_random
-                
-                if current_random_moves > 0:
-                    random = RandomAgent(player=judge.game.current_player)
-                    move = random.get_best_move(judge.game)
-                    # judge.handle_move(judge.game, move)
-
-                    move = array_to_chess_notation(move)
-                    judge.handle_move(judge.game, move)
-                    # tag that it was random
-                    judge.game_str += 'r'
-
-                    if judge.game.current_player == PLAYER1:
-                        p1_random -= 1
-                        print(f"P1 has {p1_random} random moves left")
-                    else:
-                        p2_random -= 1
-                        print(f"P2 has {p2_random} random moves left")
-                else:
-                    # current player forfeits
-                    print(f"Player {judge.game.current_player} has no random moves left. Forfeiting.")
-                    if judge.game.current_player == PLAYER1:
-                        judge.end_game(PLAYER2)
-                    else:
-                        judge.end_game(PLAYER1)
-
-                    player = 1 if judge.game.current_player == 1 else 2
-                    # indicates forfeit
-                    judge.game_str += f"-q"
-                    
-                    print("Game String:", judge.game_str)
-                    break
-
-        judge.game.display_board()
-            
-        # check for a winner
-        winner = judge.game.check_winner()
-        if winner != EMPTY:
-            judge.end_game(winner)
-            print("Game String:", judge.game_str)
-            break
-
-        # swaps player
-        judge.game.current_player *= -1
-
-        print()
-
-        # draw after certain number of moves???
-        # if judge.game.total_moves >= 32:
-        #     print("Game ended in a draw")
-        #     judge.end_game(EMPTY)
-        #     break
+    judge.play_game()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
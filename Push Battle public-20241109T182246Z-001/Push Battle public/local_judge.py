@@ -0,0 +1,97 @@
+import sys
+import time
+from PushBattle import Game, PLAYER1, PLAYER2, EMPTY
+from judge_engine import Judge, Agent, TIMEOUT
+from random_agent import RandomAgent
+from hybrid_agent2 import HybridAgent2
+
+'''
+In-process judge: plays a game between two agent objects without HTTP.
+LocalJudge is a Judge whose transport calls agent.get_best_move(game) directly, so forfeits, the two move
+attempts, the random fallback moves and the game string work as in judge_engine. It plays with
+strict_fallback on by default (fallback moves are really played); pass strict_fallback=False to reproduce the
+competition judge exactly.
+A move that raises or takes longer than the timeout counts as a failed attempt, like a request that fails or
+times out. Agents get a copy of the game, as they would after a round trip through JSON.
+'''
+
+MAX_TURNS = None    # Turns after which play_match calls a draw (None plays on like the HTTP judge)
+
+def copy_game(game):
+    """Returns an independent copy of a Game."""
+    copy = Game()
+    copy.board = game.board.copy()
+    copy.current_player = game.current_player
+    copy.turn_count = game.turn_count
+    copy.p1_pieces = game.p1_pieces
+    copy.p2_pieces = game.p2_pieces
+    copy.zobrist_board = game.zobrist_board
+    return copy
+
+class LocalJudge(Judge):
+    def __init__(self, p1, p2, timeout=TIMEOUT, verbose=False, strict_fallback=True):
+        super().__init__(None, None, strict_fallback)
+        self.p1 = p1            # agent objects with get_best_move(game)
+        self.p2 = p2
+        self.timeout = timeout  # seconds a move may take before the attempt fails
+        self.verbose = verbose
+        self.winner = None
+
+    def check_latency(self):
+        """Creates the participants; an agent in the same process has no latency."""
+        self.p1_agent = Agent("Participant1", type(self.p1).__name__)
+        self.p2_agent = Agent("Participant2", type(self.p2).__name__)
+        self.p1_agent.latency = 0.0
+        self.p2_agent.latency = 0.0
+        return True
+
+    def start_game(self):
+        """The agents are created by the caller, with their players and time limits already set."""
+        return True
+
+    def receive_move(self, attempt_number, p1_random, p2_random):
+        """Asks the player to move for its move and plays it."""
+        if self.game.current_player == PLAYER1:
+            agent, participant = self.p1, self.p1_agent
+        else:
+            agent, participant = self.p2, self.p2_agent
+        start_time = time.perf_counter()
+        try:
+            move = agent.get_best_move(copy_game(self.game))
+        except Exception as e:
+            self.log(f"Agent error: {e!r}")
+            return False
+        participant.latency = time.perf_counter() - start_time
+        if participant.latency > self.timeout:
+            self.log(f"Move took {participant.latency:.2f}s")
+            return False
+
+        handled_move = self.handle_move(self.game, move)
+        if handled_move == "forfeit":
+            return "forfeit"
+        return bool(handled_move)
+
+    def end_game(self, winner):
+        """Records the winner."""
+        self.winner = winner
+        self.log("Draw" if winner == EMPTY else f"Winner: {'PLAYER1' if winner == PLAYER1 else 'PLAYER2'}")
+
+def play_match(p1, p2, timeout=TIMEOUT, max_turns=MAX_TURNS, verbose=False, strict_fallback=True):
+    """Plays one game between two agents and returns (winner, game string, turns played).
+    strict_fallback=False reproduces the competition judge's fallback quirks (see Judge)."""
+    judge = LocalJudge(p1, p2, timeout, verbose, strict_fallback)
+    judge.check_latency()
+    judge.start_game()
+    winner = judge.play_game(max_turns)
+    return winner, judge.game_str, judge.game.turn_count
+
+def main():
+    time_limit = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    p1 = HybridAgent2(PLAYER1, depth=32, time_limit=time_limit)
+    p2 = RandomAgent(PLAYER2)
+    start = time.perf_counter()
+    winner, game_str, turns = play_match(p1, p2, verbose=True)
+    print(f"{turns} turns in {time.perf_counter() - start:.2f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+import math
+import random
+import numpy as np
+from PushBattle import PLAYER1, PLAYER2, EMPTY, BOARD_SIZE
+from movegen import legal_moves, random_move
+from bitboard import BitboardGame, completion_cells
+from deadline import Deadline
+from batch_env import random_playouts
+
+'''
+Monte Carlo Tree Search (UCT) agent.
+Every iteration walks down the tree with UCB1, expands one new move, plays a random game from there and
+backs the result up the path. The search runs until the time limit (or iteration limit) is used up, and the
+tree is kept between moves: the next call starts from the node of the position it is given.
+A node whose player to move can win on the spot only gets that winning move, so threats are seen right away.
+With playouts_per_leaf > 1 every new leaf is scored by that many random games played at once by batch_env.
+'''
+
+EXPLORATION = 1.4       # UCB1 exploration constant
+ROLLOUT_LIMIT = 60      # Plies a random playout may last before it is scored as a draw
+DRAW_SCORE = 0.5        # Score of a drawn playout for both players
+
+class MCTSNode:
+    __slots__ = ('move', 'parent', 'mover', 'key', 'winner', 'children', 'untried', 'visits', 'score')
+
+    def __init__(self, move, parent, mover, key, winner=EMPTY):
+        self.move = move            # move that led here from the parent
+        self.parent = parent
+        self.mover = mover          # player who played move
+        self.key = key              # zobrist key of the position, to find it again on the next call
+        self.winner = winner        # player who won with move, EMPTY while the game goes on
+        self.children = []
+        self.untried = None         # moves not expanded yet, filled on the first visit
+        self.visits = 0
+        self.score = 0.0            # total playout score from the point of view of mover
+
+    def is_terminal(self):
+        """Returns True if the game ended with the move into this node."""
+        return self.winner != EMPTY
+
+    def select_child(self, exploration):
+        """Returns the child with the highest UCB1 value."""
+        log_visits = math.log(self.visits)
+        best_child = None
+        best_value = float('-inf')
+        for child in self.children:
+            value = child.score / child.visits + exploration * math.sqrt(log_visits / child.visits)
+            if value > best_value:
+                best_child = child
+                best_value = value
+        return best_child
+
+class MCTSAgent:
+    def __init__(self, player=PLAYER1, time_limit=1.0, iterations=None, exploration=EXPLORATION, seed=None,
+                 playouts_per_leaf=1):
+        self.player = player
+        self.time_limit = time_limit        # seconds per move, None to only stop at the iteration limit
+        self.iterations = iterations        # iterations per move, None to only stop at the time limit
+        self.exploration = exploration
+        self.playouts_per_leaf = playouts_per_leaf  # random games per new leaf, more than 1 plays them as a batch
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
+        self.root = None                    # tree of the last search, reused by the next one
+        self.last_iterations = 0            # iterations run by the last get_best_move
+        self.reused_visits = 0              # visits inherited from the previous tree by the last get_best_move
+
+    def get_possible_moves(self, game):
+        """Returns list of all possible moves in current state."""
+        return legal_moves(game)
+
+    def find_root(self, game):
+        """Returns the node of game in the previous tree (our last move and the opponent's reply), or a new root."""
+        key = game.zobrist_key
+        if self.root is not None:
+            candidates = [self.root]
+            for child in self.root.children:
+                candidates.append(child)
+                candidates.extend(child.children)
+            for node in candidates:
+                if node.key == key and not node.is_terminal():
+                    node.parent = None      # let the rest of the old tree be freed
+                    return node
+        return MCTSNode(None, None, -game.current_player, key)
+
+    def expand_moves(self, game):
+        """Returns the moves to expand from game: a single winning move if there is one, otherwise all of them."""
+        possible_moves = self.get_possible_moves(game)
+        own = game.p1_mask if game.current_player == PLAYER1 else game.p2_mask
+        winning_cells = completion_cells(own)
+        for move in possible_moves:
+            if 1 << (move[-2] * BOARD_SIZE + move[-1]) & winning_cells:
+                token = game.make_move(move)
+                winner = game.check_move_winner(token)
+                game.unmake_move(token)
+                if winner == token[2]:
+                    return [move]
+        return possible_moves
+
+    def rollout(self, game):
+        """Plays random moves until someone wins or ROLLOUT_LIMIT runs out; returns the winner (EMPTY for a draw)."""
+        tokens = []
+        winner = EMPTY
+        for _ in range(ROLLOUT_LIMIT):
+            token = game.make_move(random_move(game, self.rng))
+            tokens.append(token)
+            winner = game.check_move_winner(token)
+            if winner != EMPTY:
+                break
+        while tokens:
+            game.unmake_move(tokens.pop())
+        return winner
+
+    def search(self, game, root):
+        """Runs one iteration: selection, expansion, playout and backpropagation."""
+        node = root
+        tokens = []
+
+        # selection: follow UCB1 through fully expanded nodes
+        while not node.is_terminal():
+            if node.untried is None:
+                node.untried = self.expand_moves(game)
+            if node.untried or not node.children:
+                break
+            node = node.select_child(self.exploration)
+            tokens.append(game.make_move(node.move))
+
+        # expansion: add one random untried move
+        if not node.is_terminal() and node.untried:
+            move = node.untried.pop(self.rng.randrange(len(node.untried)))
+            token = game.make_move(move)
+            tokens.append(token)
+            child = MCTSNode(move, node, token[2], game.zobrist_key, game.check_move_winner(token))
+            node.children.append(child)
+            node = child
+
+        # playout: the number of games won by each player (EMPTY counts the draws)
+        if node.is_terminal():
+            playouts, wins = 1, {node.winner: 1}
+        elif self.playouts_per_leaf > 1:
+            winners = random_playouts(game, self.playouts_per_leaf, self.np_rng, ROLLOUT_LIMIT)
+            playouts, wins = len(winners), {player: int((winners == player).sum()) for player in (PLAYER1, PLAYER2, EMPTY)}
+        else:
+            playouts, wins = 1, {self.rollout(game): 1}
+
+        # backpropagation
+        draws = wins.get(EMPTY, 0) * DRAW_SCORE
+        while node is not None:
+            node.visits += playouts
+            node.score += wins.get(node.mover, 0) + draws
+            node = node.parent
+        while tokens:
+            game.unmake_move(tokens.pop())
+
+    def ponder(self, game, deadline):
+        """Grows the tree under game (the opponent to move) until deadline stops; get_best_move reuses the subtree."""
+        game = BitboardGame.from_game(game)
+        root = self.find_root(game)
+        self.root = root
+        while not deadline.expired():
+            self.search(game, root)
+
+    def get_best_move(self, game):
+        """Returns the most visited move after searching until the time or iteration limit."""
+        game = BitboardGame.from_game(game)  # search on a private bitboard copy using make/unmake
+        root = self.find_root(game)
+        self.reused_visits = root.visits
+        deadline = Deadline(self.time_limit)
+
+        iterations = 0
+        while self.iterations is None or iterations < self.iterations:
+            if deadline.expired() and iterations > 0:
+                break
+            self.search(game, root)
+            iterations += 1
+        self.last_iterations = iterations
+
+        # a move that wins on the spot is always played
+        for child in root.children:
+            if child.winner == game.current_player:
+                best_child = child
+                break
+        else:
+            best_child = max(root.children, key=lambda child: child.visits)
+        self.root = best_child
+        return best_child.move
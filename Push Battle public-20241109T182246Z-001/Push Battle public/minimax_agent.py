@@ -1,5 +1,7 @@
 import random
 from PushBattle import Game, PLAYER1, PLAYER2, EMPTY, BOARD_SIZE, NUM_PIECES, _torus
+from movegen import legal_moves
+from bitboard import BitboardGame
 
 class MinimaxAgent:
     def __init__(self, player=PLAYER1, depth=3):
@@ -8,25 +10,7 @@ class MinimaxAgent:
         
     def get_possible_moves(self, game):
         """Returns list of all possible moves in current state."""
-        moves = []
-        current_pieces = game.p1_pieces if game.current_player == PLAYER1 else game.p2_pieces
-        
-        if current_pieces < NUM_PIECES:
-            # placement moves
-            for r in range(BOARD_SIZE):
-                for c in range(BOARD_SIZE):
-                    if game.board[r][c] == EMPTY:
-                        moves.append((r, c))
-        else:
-            # movement moves
-            for r0 in range(BOARD_SIZE):
-                for c0 in range(BOARD_SIZE):
-                    if game.board[r0][c0] == game.current_player:
-                        for r1 in range(BOARD_SIZE):
-                            for c1 in range(BOARD_SIZE):
-                                if game.board[r1][c1] == EMPTY:
-                                    moves.append((r0, c0, r1, c1))
-        return moves
+        return legal_moves(game)
 
     def evaluate(self, game):
         """Simple evaluation function. Higher scores are better for the agent."""
@@ -36,21 +20,15 @@ class MinimaxAgent:
         else:
             return game.p2_pieces - game.p1_pieces
 
+    def terminal_value(self, game, token):
+        """Returns the score of the position if the move in token ended the game, otherwise None."""
+        winner = game.check_move_winner(token)
+        if winner == EMPTY:
+            return None
+        return float('inf') if winner == self.player else float('-inf')
+
     def minimax(self, game, depth, maximizing_player):
         """Minimax algorithm with alpha-beta pruning."""
-        winner = game.check_winner()
-        if winner != EMPTY:
-            if winner == game.current_player:
-                if maximizing_player:
-                    return float('inf')
-                else:
-                    return float('-inf')
-            else:
-                if maximizing_player:
-                    return float('-inf')
-                else:
-                    return float('inf')
-
         if depth == 0:
             return self.evaluate(game)
         
@@ -58,45 +36,41 @@ class MinimaxAgent:
         if maximizing_player:
             max_eval = float('-inf')
             for move in possible_moves:
-                new_game = game  # make a copy of the current game state
-                if len(move) == 2:
-                    new_game.place_checker(move[0], move[1])
-                else:
-                    new_game.move_checker(move[0], move[1], move[2], move[3])
-
-                eval = self.minimax(new_game, depth - 1, False)  # minimize for the opponent
+                token = game.make_move(move)
+                eval = self.terminal_value(game, token)
+                if eval is None:
+                    eval = self.minimax(game, depth - 1, False)  # minimize for the opponent
+                game.unmake_move(token)
                 max_eval = max(max_eval, eval)
             return max_eval
         else:
             min_eval = float('inf')
             for move in possible_moves:
-                new_game = game  # make a copy of the current game state
-                if len(move) == 2:
-                    new_game.place_checker(move[0], move[1])
-                else:
-                    new_game.move_checker(move[0], move[1], move[2], move[3])
-
-                eval = self.minimax(new_game, depth - 1, True)  # maximize for the agent
+                token = game.make_move(move)
+                eval = self.terminal_value(game, token)
+                if eval is None:
+                    eval = self.minimax(game, depth - 1, True)  # maximize for the agent
+                game.unmake_move(token)
                 min_eval = min(min_eval, eval)
             return min_eval
     
     def get_best_move(self, game):
         """Returns the best move using the Minimax algorithm."""
+        game = BitboardGame.from_game(game)  # search on a private bitboard copy using make/unmake
         possible_moves = self.get_possible_moves(game)
         best_move = None
-        best_value = float('-inf') if game.current_player == self.player else float('inf')
+        maximizing_player = game.current_player == self.player
+        best_value = float('-inf') if maximizing_player else float('inf')
         
         for move in possible_moves:
-            new_game = game  # make a copy of the current game state
-            if len(move) == 2:
-                new_game.place_checker(move[0], move[1])
-            else:
-                new_game.move_checker(move[0], move[1], move[2], move[3])
-
-            move_value = self.minimax(new_game, self.depth - 1, game.current_player == self.player)
+            token = game.make_move(move)
+            move_value = self.terminal_value(game, token)
+            if move_value is None:
+                move_value = self.minimax(game, self.depth - 1, not maximizing_player)
+            game.unmake_move(token)
             
-            if (game.current_player == self.player and move_value > best_value) or \
-               (game.current_player != self.player and move_value < best_value):
+            if (maximizing_player and move_value > best_value) or \
+               (not maximizing_player and move_value < best_value):
                 best_value = move_value
                 best_move = move
         
@@ -0,0 +1,69 @@
+from PushBattle import PLAYER1, BOARD_SIZE
+from bitboard import completion_cells
+
+'''
+Move ordering for the alpha-beta searches.
+Moves are tried in this order: moves that complete three in a row, moves that take a cell the opponent needs
+to complete three in a row, the transposition table move, the killer moves of the ply, then everything else
+by history score. Works on a BitboardGame.
+'''
+
+MAX_PLY = 64        # Deepest ply that keeps killer moves
+
+##################
+
+class MoveOrderer:
+    def __init__(self):
+        self.killers = [[None, None] for _ in range(MAX_PLY)]     # two quiet moves per ply that caused a cut-off
+        self.history = {}                                          # move -> accumulated cut-off score
+
+    def new_search(self):
+        """Forgets the killers and ages the history scores before searching a new position."""
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.history = {move: score // 2 for move, score in self.history.items() if score > 1}
+
+    def order(self, game, moves, ply, tt_move=None):
+        """Returns moves sorted from most to least promising."""
+        if game.current_player == PLAYER1:
+            own, opponent = game.p1_mask, game.p2_mask
+        else:
+            own, opponent = game.p2_mask, game.p1_mask
+        winning_cells = completion_cells(own)
+        blocking_cells = completion_cells(opponent) & ~own
+        killers = self.killers[ply] if ply < MAX_PLY else (None, None)
+
+        wins = []
+        blocks = []
+        preferred = []
+        rest = []
+        for move in moves:
+            dest = 1 << (move[-2] * BOARD_SIZE + move[-1])
+            if dest & winning_cells and self.is_win(game, move):
+                wins.append(move)
+            elif dest & blocking_cells:
+                blocks.append(move)
+            elif move == tt_move:
+                preferred.insert(0, move)
+            elif move == killers[0] or move == killers[1]:
+                preferred.append(move)
+            else:
+                rest.append(move)
+        history = self.history
+        rest.sort(key=lambda move: history.get(move, 0), reverse=True)
+        return wins + blocks + preferred + rest
+
+    def is_win(self, game, move):
+        """Returns True if move wins on the spot for the player to move."""
+        token = game.make_move(move)
+        winner = game.check_move_winner(token)
+        game.unmake_move(token)
+        return winner == token[2]
+
+    def record_cutoff(self, move, ply, depth):
+        """Remembers a move that caused a cut-off at ply with depth left to search."""
+        self.history[move] = self.history.get(move, 0) + depth * depth
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
@@ -0,0 +1,103 @@
+import random
+import numpy as np
+from PushBattle import PLAYER1, PLAYER2, BOARD_SIZE, NUM_PIECES
+from bitboard import BitboardGame, FULL_MASK, iter_bits, mask_from_array
+
+'''
+Shared move generator for every agent.
+Moves are small integers derived from the occupancy masks of the position:
+a placement is the 6-bit cell r * BOARD_SIZE + c, a movement is the 12-bit (from_cell << 6) | to_cell.
+Whether a code is a placement or a movement follows from the position it belongs to (see is_placement).
+Moves are produced in raster order, the same order the agents' old nested loops used.
+'''
+
+NO_MOVE = -1    # Code used when there is no move
+
+CELL_BITS = 6   # Bits per cell in a move code
+CELL_MASK = (1 << CELL_BITS) - 1
+
+# Tuples for every code, built once so converting a move list never allocates
+PLACEMENT_TUPLES = [divmod(cell, BOARD_SIZE) for cell in range(BOARD_SIZE * BOARD_SIZE)]
+MOVEMENT_TUPLES = [PLACEMENT_TUPLES[code >> CELL_BITS] + PLACEMENT_TUPLES[code & CELL_MASK]
+                   for code in range(1 << (2 * CELL_BITS))]
+
+##################
+
+def is_placement(game):
+    """Returns True if the player to move still has pieces to place."""
+    pieces = game.p1_pieces if game.current_player == PLAYER1 else game.p2_pieces
+    return pieces < NUM_PIECES
+
+def occupancy(game):
+    """Returns the (own, empty) masks of the player to move, for a BitboardGame or a numpy-backed Game."""
+    if isinstance(game, BitboardGame):
+        p1, p2 = game.p1_mask, game.p2_mask
+    else:
+        p1 = mask_from_array(game.board == PLAYER1)
+        p2 = mask_from_array(game.board == PLAYER2)
+    own = p1 if game.current_player == PLAYER1 else p2
+    return own, FULL_MASK ^ (p1 | p2)
+
+def iter_moves(game):
+    """Lazily yields the move codes of the position."""
+    own, empty = occupancy(game)
+    if is_placement(game):
+        yield from iter_bits(empty)
+    else:
+        empties = list(iter_bits(empty))
+        for src in iter_bits(own):
+            base = src << CELL_BITS
+            for dst in empties:
+                yield base | dst
+
+def generate_moves(game):
+    """Returns the move codes of the position as a list."""
+    own, empty = occupancy(game)
+    if is_placement(game):
+        return list(iter_bits(empty))
+    empties = list(iter_bits(empty))
+    return [src << CELL_BITS | dst for src in iter_bits(own) for dst in empties]
+
+def move_array(game):
+    """Returns the move codes of the position as a numpy array."""
+    own, empty = occupancy(game)
+    empties = np.fromiter(iter_bits(empty), dtype=np.uint16)
+    if is_placement(game):
+        return empties
+    sources = np.fromiter(iter_bits(own), dtype=np.uint16) << CELL_BITS
+    return (sources[:, None] | empties[None, :]).ravel()
+
+def legal_moves(game):
+    """Returns the moves of the position as (r, c) / (r0, c0, r1, c1) tuples."""
+    own, empty = occupancy(game)
+    if is_placement(game):
+        return [PLACEMENT_TUPLES[dst] for dst in iter_bits(empty)]
+    empties = list(iter_bits(empty))
+    return [MOVEMENT_TUPLES[src << CELL_BITS | dst] for src in iter_bits(own) for dst in empties]
+
+def random_move(game, rng=random):
+    """Returns one uniformly random legal move as a tuple, without building the whole move list."""
+    own, empty = occupancy(game)
+    dst = rng.choice(list(iter_bits(empty)))
+    if is_placement(game):
+        return PLACEMENT_TUPLES[dst]
+    src = rng.choice(list(iter_bits(own)))
+    return MOVEMENT_TUPLES[src << CELL_BITS | dst]
+
+def encode_move(move):
+    """Packs a (r, c) or (r0, c0, r1, c1) move into its code."""
+    if move is None:
+        return NO_MOVE
+    if len(move) == 2:
+        return move[0] * BOARD_SIZE + move[1]
+    return (move[0] * BOARD_SIZE + move[1]) << CELL_BITS | (move[2] * BOARD_SIZE + move[3])
+
+def decode_move(code, placement):
+    """Unpacks a move code into its tuple; placement tells which kind of move the code is."""
+    if code == NO_MOVE:
+        return None
+    return PLACEMENT_TUPLES[code] if placement else MOVEMENT_TUPLES[code]
+
+def to_move_list(code, placement):
+    """Converts a move code into the [r0, c0] / [r0, c0, r1, c1] list that /move returns."""
+    return list(decode_move(code, placement))
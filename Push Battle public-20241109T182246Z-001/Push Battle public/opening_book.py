@@ -0,0 +1,87 @@
+import os
+import sys
+import time
+import numpy as np
+from PushBattle import PLAYER1, PLAYER2
+from movegen import is_placement, encode_move, decode_move
+from symmetry import canonical_key, transform_move, INVERSE
+from pn_solver import opening_positions
+from hybrid_agent2 import HybridAgent2
+
+'''
+Opening book for the placement phase.
+The builder searches every opening up to BOOK_PLIES moves (one position per symmetry class) with HybridAgent2
+and stores the move it picks, turned into the canonical frame of the position.
+The file is a 16-byte header followed by (canonical key, move code) records sorted by key, so OpeningBook can
+memory-map it and binary-search it without reading it all in.
+'''
+
+MAGIC = b'PBBOOK01'
+HEADER_BYTES = 16       # MAGIC followed by the number of records
+ENTRY_DTYPE = np.dtype([('key', '<u8'), ('move', '<u2')])
+
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'saved_models', 'opening_book.bin')
+BOOK_PLIES = 3          # Openings of up to this many moves are put in the book
+BOOK_DEPTH = 32         # Deepest iteration of the search behind every book move
+BOOK_TIME = 10.0        # Seconds of search behind every book move
+
+##################
+
+def write_book(path, entries):
+    """Writes {canonical key: move code} as a sorted book file."""
+    records = np.array(sorted(entries.items()), dtype=ENTRY_DTYPE)
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(records)).tobytes())
+        f.write(records.tobytes())
+
+def build_book(path=BOOK_PATH, plies=BOOK_PLIES, depth=BOOK_DEPTH, time_limit=BOOK_TIME):
+    """Searches every opening of up to plies moves and writes the chosen moves to a book file."""
+    agents = {player: HybridAgent2(player, depth=depth, time_limit=time_limit) for player in (PLAYER1, PLAYER2)}
+    entries = {}
+    for ply in range(plies + 1):
+        positions = opening_positions(ply)
+        start = time.perf_counter()
+        for game in positions:
+            move = agents[game.current_player].get_best_move(game)
+            key, t = canonical_key(game)
+            entries[key] = encode_move(transform_move(move, t))
+        print(f"ply {ply}: {len(positions)} positions in {time.perf_counter() - start:.1f}s")
+    write_book(path, entries)
+    return len(entries)
+
+class OpeningBook:
+    def __init__(self, path=BOOK_PATH):
+        self.records = np.zeros(0, dtype=ENTRY_DTYPE)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                header = f.read(HEADER_BYTES)
+            if header[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not an opening book")
+            count = int(np.frombuffer(header[len(MAGIC):], dtype='<u8')[0])
+            if count:
+                self.records = np.memmap(path, dtype=ENTRY_DTYPE, mode='r', offset=HEADER_BYTES, shape=(count,))
+        self.keys = self.records['key']
+
+    def __len__(self):
+        return len(self.records)
+
+    def lookup(self, game):
+        """Returns the book move for game as a tuple, or None if the position is not in the book."""
+        if not len(self.records) or not is_placement(game):
+            return None
+        key, t = canonical_key(game)
+        i = int(np.searchsorted(self.keys, np.uint64(key)))
+        if i == len(self.keys) or int(self.keys[i]) != key:
+            return None
+        move = decode_move(int(self.records['move'][i]), True)
+        return transform_move(move, INVERSE[t])
+
+def main():
+    plies = int(sys.argv[1]) if len(sys.argv) > 1 else BOOK_PLIES
+    path = sys.argv[2] if len(sys.argv) > 2 else BOOK_PATH
+    count = build_book(path, plies)
+    print(f"wrote {count} positions to {path}")
+
+if __name__ == '__main__':
+    main()
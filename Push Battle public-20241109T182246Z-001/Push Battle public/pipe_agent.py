@@ -0,0 +1,109 @@
+import sys
+import numpy as np
+from PushBattle import Game, PLAYER1, PLAYER2, EMPTY, BOARD_SIZE
+from sessions import GameSession
+from ponder import ponder_slot
+from tournament import make_agent
+
+'''
+Agent side of the pipe transport: plays games for a judge that runs it as a child process (see pipe_judge.py).
+Requests arrive on stdin and replies leave on stdout, one line each:
+    ping <seq>                                          ->  <seq> ok
+    start <seq> <first_turn 0|1> <max_latency> <game>   ->  <seq> ok
+    move <seq> <attempt> <random_attempts> <game>       ->  <seq> <r0> <c0> [<r1> <c1>]
+    end <seq> <winner> <game>                           ->  <seq> ok
+    quit
+A request that fails is answered with "<seq> error <message>". <game> is the compact encoding of encode_game.
+The agent is built from a tournament spec and kept in a GameSession for the whole game, as in player1.py.
+Anything the agent prints goes to stderr, so stdout only carries replies.
+'''
+
+BOARD_SYMBOLS = {EMPTY: '.', PLAYER1: 'W', PLAYER2: 'B'}   # Same letters as Game.display_board
+BOARD_VALUES = {symbol: value for value, symbol in BOARD_SYMBOLS.items()}
+
+##################
+
+def encode_game(game):
+    """Returns a game as one token: 64 board letters, then current player, turn count and pieces placed."""
+    board = ''.join(BOARD_SYMBOLS[int(tile)] for tile in np.asarray(game.board).flat)
+    return f"{board}:{game.current_player}:{game.turn_count}:{game.p1_pieces}:{game.p2_pieces}"
+
+def decode_game(token):
+    """Returns the Game encoded by encode_game."""
+    board, current_player, turn_count, p1_pieces, p2_pieces = token.split(':')
+    game = Game()
+    game.board = np.array([BOARD_VALUES[symbol] for symbol in board]).reshape(BOARD_SIZE, BOARD_SIZE)
+    game.current_player = int(current_player)
+    game.turn_count = int(turn_count)
+    game.p1_pieces = int(p1_pieces)
+    game.p2_pieces = int(p2_pieces)
+    game.rehash()
+    return game
+
+class PipeAgent:
+    def __init__(self, spec, pondering=False):
+        self.spec = spec            # tournament agent spec, e.g. "HybridAgent2(depth=32, time_limit=3)"
+        self.pondering = pondering
+        self.session = None         # GameSession of the game being played
+
+    def handle(self, kind, fields):
+        """Answers one request and returns the reply (without its sequence number)."""
+        if kind == 'ping':
+            return 'ok'
+        if kind == 'start':
+            first_turn, max_latency, game = fields
+            self.end()
+            agent = make_agent(self.spec, PLAYER1 if first_turn == '1' else PLAYER2)
+            self.session = GameSession(agent, decode_game(game), self.pondering)
+            return 'ok'
+        if kind == 'move':
+            attempt_number, random_attempts, game = fields
+            game = decode_game(game)
+            if self.session is None:
+                # a game whose start this agent never saw: pick it up from the current position
+                self.session = GameSession(make_agent(self.spec, game.current_player), game, self.pondering)
+            session = self.session
+            with ponder_slot.searching():
+                session.ponderer.stop()
+                game = session.sync(game)
+                move = session.agent.get_best_move(game)
+                session.play(move)
+            session.ponderer.start(session.agent, game, move)
+            return ' '.join(str(int(x)) for x in move)
+        if kind == 'end':
+            self.end()
+            return 'ok'
+        raise ValueError(f"unknown request {kind!r}")
+
+    def end(self):
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+    def serve(self, requests, replies):
+        """Answers requests (an iterable of lines) on replies until quit or the end of the input."""
+        for line in requests:
+            words = line.split()
+            if not words:
+                continue
+            if words[0] == 'quit':
+                break
+            kind, seq, fields = words[0], words[1], words[2:]
+            try:
+                reply = self.handle(kind, fields)
+            except Exception as e:
+                reply = f"error {type(e).__name__}: {e}".replace('\n', ' ')
+            replies.write(f"{seq} {reply}\n")
+            replies.flush()
+        self.end()
+
+def main():
+    if len(sys.argv) < 2:
+        print("usage: python pipe_agent.py <agent spec> [--ponder]", file=sys.stderr)
+        sys.exit(2)
+    replies = sys.stdout
+    sys.stdout = sys.stderr  # keep agent output off the reply channel
+    PipeAgent(sys.argv[1], '--ponder' in sys.argv[2:]).serve(sys.stdin, replies)
+
+if __name__ == '__main__':
+    main()
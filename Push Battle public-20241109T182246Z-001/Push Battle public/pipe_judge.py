@@ -0,0 +1,161 @@
+import os
+import select
+import subprocess
+import sys
+import time
+from PushBattle import PLAYER1, EMPTY
+from judge_engine import Judge, Agent, TIMEOUT
+from pipe_agent import encode_game
+
+'''
+Judge over pipes: runs each agent as a child process (pipe_agent.py) and talks to it with one-line messages on
+its stdin / stdout instead of HTTP.
+PipeJudge keeps Judge's rules and lifecycle (start, the two move attempts, random fallback moves, forfeits, end);
+only the transport changes. Every request has TIMEOUT seconds: the judge waits on the pipe with select, so a late
+reply is never waited for, and replies carry the request's sequence number so a late one is skipped when it
+finally arrives. A child that exits or answers with an error fails the attempt, like a failed request.
+'''
+
+STARTUP_TIMEOUT = 10.0  # Seconds a child may take to import its agent and answer the first ping
+QUIT_TIMEOUT = 1.0      # Seconds a child gets to exit after quit before it is killed
+AGENT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pipe_agent.py')
+
+def agent_command(spec, pondering=False):
+    """Returns the command that runs an agent spec as a pipe agent."""
+    return [sys.executable, AGENT_SCRIPT, spec] + (['--ponder'] if pondering else [])
+
+class AgentProcess:
+    def __init__(self, command):
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, bufsize=0)
+        self.buffer = b''
+        self.seq = 0
+
+    def request(self, kind, fields=(), timeout=TIMEOUT):
+        """Sends a request and returns the reply to it; raises OSError if the child fails or runs out of time."""
+        self.seq += 1
+        line = ' '.join([kind, str(self.seq)] + [str(field) for field in fields]) + '\n'
+        self.process.stdin.write(line.encode())
+        end = time.monotonic() + timeout
+        while True:
+            seq, _, reply = self.read_line(end).partition(' ')
+            if seq == str(self.seq):
+                return reply
+            # the reply to an earlier request that had already timed out
+
+    def read_line(self, end):
+        """Returns the next line of the child's output, waiting until end at most."""
+        fd = self.process.stdout.fileno()
+        while b'\n' not in self.buffer:
+            remaining = end - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                raise TimeoutError("no reply in time")
+            chunk = os.read(fd, 1 << 16)
+            if not chunk:
+                raise ConnectionResetError("agent process exited")
+            self.buffer += chunk
+        line, _, self.buffer = self.buffer.partition(b'\n')
+        return line.decode()
+
+    def close(self):
+        """Asks the child to quit, killing it if it does not."""
+        try:
+            self.process.stdin.write(b'quit\n')
+            self.process.stdin.close()
+            self.process.wait(QUIT_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+
+class PipeJudge(Judge):
+    def __init__(self, p1_command, p2_command, timeout=TIMEOUT, verbose=True, strict_fallback=False):
+        super().__init__(' '.join(p1_command), ' '.join(p2_command), strict_fallback)
+        self.p1_command = p1_command
+        self.p2_command = p2_command
+        self.timeout = timeout      # seconds every request may take
+        self.verbose = verbose
+        self.p1_process = None
+        self.p2_process = None
+
+    def send(self, process, kind, fields, timeout=None):
+        """Sends a request and returns the reply, or None if the child failed, timed out or answered an error."""
+        try:
+            reply = process.request(kind, fields, self.timeout if timeout is None else timeout)
+        except OSError:
+            return None
+        return None if reply.startswith('error') else reply
+
+    def check_latency(self):
+        """Starts both agent processes and measures how long they take to answer"""
+        self.p1_process = AgentProcess(self.p1_command)
+        self.p2_process = AgentProcess(self.p2_command)
+        agents = []
+        for process, participant, name in ((self.p1_process, "Participant1", "Agent1"), (self.p2_process, "Participant2", "Agent2")):
+            start_time = time.time()
+            if self.send(process, 'ping', (), STARTUP_TIMEOUT) is None:
+                return False
+            agent = Agent(participant, name)
+            agent.latency = time.time() - start_time
+            agents.append(agent)
+        self.p1_agent, self.p2_agent = agents
+        return True
+
+    def start_game(self):
+        """ Start the game for both players """
+        game = encode_game(self.game)
+        if self.send(self.p1_process, 'start', (1, self.timeout, game)) is None:
+            return False
+        return self.send(self.p2_process, 'start', (0, self.timeout, game)) is not None
+
+    def receive_move(self, attempt_number, p1_random, p2_random):
+        """ Receive the move of the current player and play it """
+        if self.game.current_player == PLAYER1:
+            process, participant, random_attempts = self.p1_process, self.p1_agent, p1_random
+        else:
+            process, participant, random_attempts = self.p2_process, self.p2_agent, p2_random
+        start_time = time.time()
+        reply = self.send(process, 'move', (attempt_number, random_attempts, encode_game(self.game)))
+        participant.latency = time.time() - start_time
+        if reply is None:
+            return False
+        try:
+            move = [int(x) for x in reply.split()]
+        except ValueError:
+            move = None
+        return self.handle_move(self.game, move)
+
+    def end_game(self, winner):
+        """ End the game for both players """
+        game = encode_game(self.game)
+        self.send(self.p1_process, 'end', (int(winner), game))
+        self.send(self.p2_process, 'end', (int(winner), game))
+        self.log("Draw" if winner == EMPTY else f"Winner: {'PLAYER1' if winner == PLAYER1 else 'PLAYER2'}")
+
+    def close(self):
+        """Stops both agent processes."""
+        for process in (self.p1_process, self.p2_process):
+            if process is not None:
+                process.close()
+
+def main():
+    if len(sys.argv) < 3:
+        print('usage: python pipe_judge.py "<p1 agent spec>" "<p2 agent spec>"')
+        return
+    judge = PipeJudge(agent_command(sys.argv[1]), agent_command(sys.argv[2]))
+    try:
+        if not judge.check_latency():
+            print("Failed to connect to one or both players")
+            return
+        print(f"Initial latencies - P1: {judge.p1_agent.latency:.3f}s, P2: {judge.p2_agent.latency:.3f}s")
+
+        print("Starting game...")
+        if not judge.start_game():
+            print("Failed to start game")
+            return
+        start = time.perf_counter()
+        judge.play_game()
+        print(f"{judge.game.turn_count} turns in {time.perf_counter() - start:.2f}s")
+    finally:
+        judge.close()
+
+if __name__ == '__main__':
+    main()
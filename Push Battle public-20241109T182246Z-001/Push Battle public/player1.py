@@ -5,6 +5,10 @@ from random_agent import RandomAgent
 from minimax_agent import MinimaxAgent
 from alphabeta_agent import AlphaBetaAgent
 from reinforcementq_agent import QLearningAgent
+from hybrid_agent2 import HybridAgent2
+from opening_book import OpeningBook, BOOK_PATH
+from sessions import GameSession, SessionStore
+from ponder import ponder_slot
 
 # Import This
 # from <AGENT FILENAME> import <AGENT CLASSNAME>
@@ -13,6 +17,25 @@ app = Flask(__name__)
 
 agent = None
 
+SEARCH_DEPTH = 32       # Deepest iteration the agent may reach; in practice the time budget stops it first
+LATENCY_MARGIN = 0.75   # Seconds of max_latency kept back for the request, the response and setting up the search
+
+PONDERING = True        # Keep searching on the opponent's time between /move requests
+DEFAULT_LATENCY = 4     # max_latency assumed for a game whose /start this server never saw
+
+book = OpeningBook(BOOK_PATH)   # Memory-mapped once; empty if the book has not been built
+sessions = SessionStore()       # One session (agent, caches, last position) per game being played
+
+def new_agent(player, max_latency):
+    """Creates the agent for one game."""
+    # search with iterative deepening for as long as the judge allows
+    time_limit = max(max_latency - LATENCY_MARGIN, 0.1)
+    return HybridAgent2(player, depth=SEARCH_DEPTH, time_limit=time_limit, opening_book=book)
+
+def game_id(data):
+    """Returns the id of the game a request belongs to (the judge's address if it sends none)."""
+    return data.get('game_id') or request.remote_addr
+
 @app.route('/start', methods=['POST'])
 def start_game():
     """
@@ -37,7 +60,9 @@ def start_game():
 
     ##### MODIFY BELOW #####
 
-    agent = RandomAgent(PLAYER1)
+    # the agent, its caches and the position live in the game's session until /end
+    agent = new_agent(PLAYER1 if first_turn else PLAYER2, max_latency)
+    sessions.start(game_id(data), GameSession(agent, game, PONDERING))
 
     ###################
     
@@ -81,7 +106,19 @@ def make_move():
     # Move logic should go here
     # This is where you'd call your minimax/MCTS/neural network/etc
 
-    move = agent.get_best_move(game)
+    session = sessions.get(game_id(data))
+    if session is None:
+        # a game that started before this server did: pick it up from the current position
+        session = sessions.start(game_id(data), GameSession(new_agent(game.current_player, DEFAULT_LATENCY), game, PONDERING))
+
+    with session.lock:
+        # the search gets the core to itself: any game's ponder is stopped until the move is found
+        with ponder_slot.searching():
+            session.ponderer.stop()
+            game = session.sync(game)
+            move = session.agent.get_best_move(game)
+            session.play(move)
+        session.ponderer.start(session.agent, game, move)
 
     ###################
     
@@ -89,6 +126,13 @@ def make_move():
         "move": move  # Return your chosen move
     })
 
+@app.after_request
+def end_session(response):
+    """Drops the session of a game once its /end has been handled (the /end route itself is not ours to change)."""
+    if request.path == '/end' and request.method == 'POST':
+        sessions.end(game_id(request.get_json(silent=True) or {}))
+    return response
+
 # ====================================
 # DO NOT MODIFY BELOW THIS LINE
 # ====================================
@@ -9,6 +9,8 @@ from random_agent import RandomAgent
 from minimax_agent import MinimaxAgent
 from alphabeta_agent import AlphaBetaAgent
 from reinforcementq_agent import QLearningAgent
+from sessions import GameSession, SessionStore
+from ponder import ponder_slot
 
 app = Flask(__name__)
 
@@ -17,6 +19,14 @@ agent = None
 # Define a fixed path for your model
 MODEL_PATH = 'Push Battle public-20241109T182246Z-001/Push Battle public/saved_models/qagent_latest.pkl'
 
+PONDERING = True        # Keep thinking on the opponent's time between /move requests (agents with a ponder method only)
+
+sessions = SessionStore()       # One session (agent, caches, last position) per game being played
+
+def game_id(data):
+    """Returns the id of the game a request belongs to (the judge's address if it sends none)."""
+    return data.get('game_id') or request.remote_addr
+
 @app.route('/start', methods=['POST'])
 def start_game():
     """
@@ -71,6 +81,9 @@ def start_game():
     except Exception as e:
         print(f"An error occurred: {str(e)}")
 
+    # the agent and the position live in the game's session until /end
+    sessions.start(game_id(data), GameSession(agent, game, PONDERING))
+
     ###################
     
     return jsonify({
@@ -113,7 +126,19 @@ def make_move():
     # Move logic should go here
     # This is where you'd call your minimax/MCTS/neural network/etc
 
-    move = agent.get_best_move(game)
+    session = sessions.get(game_id(data))
+    if session is None:
+        # a game that started before this server did: pick it up from the current position
+        session = sessions.start(game_id(data), GameSession(agent or QLearningAgent(player=game.current_player), game, PONDERING))
+
+    with session.lock:
+        # the search gets the core to itself: any game's ponder is stopped until the move is found
+        with ponder_slot.searching():
+            session.ponderer.stop()
+            game = session.sync(game)
+            move = session.agent.get_best_move(game)
+            session.play(move)
+        session.ponderer.start(session.agent, game, move)
 
     ###################
     
@@ -121,6 +146,13 @@ def make_move():
         "move": move  # Return your chosen move
     })
 
+@app.after_request
+def end_session(response):
+    """Drops the session of a game once its /end has been handled (the /end route itself is not ours to change)."""
+    if request.path == '/end' and request.method == 'POST':
+        sessions.end(game_id(request.get_json(silent=True) or {}))
+    return response
+
 # ====================================
 # DO NOT MODIFY BELOW THIS LINE
 # ====================================
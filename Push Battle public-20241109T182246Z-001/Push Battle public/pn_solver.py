@@ -0,0 +1,177 @@
+import json
+import os
+import sys
+from PushBattle import Game, PLAYER1, EMPTY
+from bitboard import BitboardGame
+from movegen import legal_moves, is_placement
+from symmetry import canonical_key, transform_move, unique_moves, INVERSE
+from deadline import Deadline, SearchTimeout
+
+'''
+Depth-first proof-number search (df-pn) for placement-phase positions.
+solve() proves or disproves that the player to move can force three in a row before the placement phase ends:
+positions where the player to move has no pieces left to place count as not won for the solver's player,
+so a proven WIN is a real forced win and NO_WIN only means there is none inside the placement phase.
+Proof and disproof numbers are kept in a node table bounded by max_entries, keyed by zobrist key.
+Results go to a JSON lines file keyed by the symmetry-canonical key (see symmetry.py), so SolvedPositions can
+answer every symmetric copy of a solved position.
+'''
+
+WIN = 'win'             # The player to move forces a win during the placement phase
+NO_WIN = 'no_win'       # The player to move cannot force a win during the placement phase
+
+INFINITY = 10 ** 9      # Proof / disproof number of a settled position
+MAX_ENTRIES = 1 << 20   # Node table entries kept before unsettled ones are dropped
+RESULTS_PATH = 'saved_models/solved_positions.jsonl'
+OPENING_PLIES = 2       # Plies of openings the command line solves
+NODE_LIMIT = 200000     # Positions the command line may visit per opening
+
+class ProofNumberSolver:
+    def __init__(self, max_entries=MAX_ENTRIES, node_limit=None):
+        self.max_entries = max_entries
+        self.node_limit = node_limit    # None for no limit
+        self.table = {}                 # zobrist key -> [phi, delta] of the player to move there
+        self.deadline = Deadline()
+        self.player = PLAYER1           # player the solve tries to prove a win for
+        self.nodes = 0                  # positions expanded by the last solve
+
+    def solve(self, game, deadline=None):
+        """Returns (WIN or NO_WIN, winning move or None) for the player to move, or None if the budget runs out."""
+        game = BitboardGame.from_game(game)  # search on a private bitboard copy using make/unmake
+        self.deadline = deadline if deadline is not None else Deadline()
+        if game.current_player != self.player:
+            self.table = {}     # settled numbers at the end of the placement phase depend on the solver's player
+        self.player = game.current_player
+        self.nodes = 0
+        if not is_placement(game):
+            return NO_WIN, None
+        try:
+            phi, delta = self.mid(game, INFINITY, INFINITY)
+        except SearchTimeout:
+            return None
+        if phi == 0:
+            return WIN, self.proving_move(game)
+        return NO_WIN, None
+
+    def proving_move(self, game):
+        """Returns the move of a proven position that leads to a position lost for the opponent."""
+        for move in legal_moves(game):
+            token = game.make_move(move)
+            phi, delta = self.child_numbers(game, token)
+            game.unmake_move(token)
+            if delta == 0:
+                return move
+        return None
+
+    def child_numbers(self, game, token):
+        """Returns (phi, delta) of the position token's move led to, from the point of view of its player to move."""
+        winner = game.check_move_winner(token)
+        if winner != EMPTY:
+            return (0, INFINITY) if winner == game.current_player else (INFINITY, 0)
+        if not is_placement(game):
+            # the placement phase is over without a win for the solver's player
+            return (INFINITY, 0) if game.current_player == self.player else (0, INFINITY)
+        entry = self.table.get(game.zobrist_key)
+        return (entry[0], entry[1]) if entry is not None else (1, 1)
+
+    def store(self, key, phi, delta):
+        """Records the numbers of a position, dropping unsettled entries once the table is full."""
+        if len(self.table) >= self.max_entries and key not in self.table:
+            self.table = {k: v for k, v in self.table.items() if v[0] == 0 or v[1] == 0}
+            if len(self.table) >= self.max_entries:
+                self.table = {}
+        self.table[key] = [phi, delta]
+
+    def mid(self, game, phi_threshold, delta_threshold):
+        """Expands game until its phi or delta reaches its threshold; returns the final (phi, delta)."""
+        self.nodes += 1
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise SearchTimeout()
+        self.deadline.check()
+        key = game.zobrist_key
+        # symmetric moves lead to symmetric positions with the same numbers
+        moves = unique_moves(game, legal_moves(game))
+
+        while True:
+            # phi of a position is the smallest delta of its children, delta is the sum of their phis
+            phi = INFINITY
+            delta = 0
+            best_move = None
+            best_phi = 0
+            second_delta = INFINITY
+            for move in moves:
+                token = game.make_move(move)
+                child_phi, child_delta = self.child_numbers(game, token)
+                game.unmake_move(token)
+                delta = min(delta + child_phi, INFINITY)
+                if child_delta < phi:
+                    second_delta = phi
+                    phi = child_delta
+                    best_move = move
+                    best_phi = child_phi
+                elif child_delta < second_delta:
+                    second_delta = child_delta
+            if phi >= phi_threshold or delta >= delta_threshold:
+                self.store(key, phi, delta)
+                return phi, delta
+
+            token = game.make_move(best_move)
+            self.mid(game, delta_threshold - delta + best_phi, min(phi_threshold, second_delta + 1))
+            game.unmake_move(token)
+
+class SolvedPositions:
+    def __init__(self, path=RESULTS_PATH):
+        self.results = {}   # canonical key -> (result, move in the canonical frame)
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    record = json.loads(line)
+                    move = tuple(record['move']) if record['move'] is not None else None
+                    self.results[record['key']] = (record['result'], move)
+
+    def lookup(self, game):
+        """Returns (result, move) for game if it or a symmetric copy was solved, otherwise None."""
+        key, t = canonical_key(game)
+        entry = self.results.get(key)
+        if entry is None:
+            return None
+        result, move = entry
+        return result, (transform_move(move, INVERSE[t]) if move is not None else None)
+
+def write_result(path, game, result, move):
+    """Appends a solved position to the results file."""
+    key, t = canonical_key(game)
+    record = {'key': key, 'turn': game.turn_count, 'result': result,
+              'move': list(transform_move(move, t)) if move is not None else None}
+    with open(path, 'a') as f:
+        f.write(json.dumps(record) + '\n')
+
+def opening_positions(plies):
+    """Returns one position of every symmetry class reachable from the empty board in exactly plies moves."""
+    positions = [BitboardGame.from_game(Game())]
+    for _ in range(plies):
+        children = {}
+        for game in positions:
+            for move in unique_moves(game, legal_moves(game)):
+                child = game.copy()
+                token = child.make_move(move)
+                if child.check_move_winner(token) == EMPTY:
+                    children.setdefault(canonical_key(child)[0], child)
+        positions = list(children.values())
+    return positions
+
+def main():
+    plies = int(sys.argv[1]) if len(sys.argv) > 1 else OPENING_PLIES
+    path = sys.argv[2] if len(sys.argv) > 2 else RESULTS_PATH
+    solver = ProofNumberSolver(node_limit=NODE_LIMIT)
+    for game in opening_positions(plies):
+        outcome = solver.solve(game)
+        if outcome is None:
+            print(f"turn {game.turn_count}: unsolved after {solver.nodes} nodes")
+            continue
+        result, move = outcome
+        write_result(path, game, result, move)
+        print(f"turn {game.turn_count}: {result} {move} ({solver.nodes} nodes)")
+
+if __name__ == '__main__':
+    main()
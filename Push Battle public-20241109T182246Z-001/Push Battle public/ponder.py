@@ -0,0 +1,86 @@
+import threading
+from contextlib import contextmanager
+from PushBattle import EMPTY
+from bitboard import BitboardGame
+from deadline import Deadline
+
+'''
+Pondering: thinking on the opponent's time.
+After the server answers /move, Ponderer plays the agent's move on a copy of the game and calls
+agent.ponder(game, deadline) in a background thread. The agent searches the likely continuations and keeps
+what it finds (HybridAgent2 in its transposition table, MCTSAgent in its tree). The next request calls stop()
+first, which ends the search at its next deadline check and waits for the thread, so the agent is never used
+by two threads at once.
+The host has a single core, so all Ponderers share one PonderSlot: only one ponder runs at a time, every /move
+stops it for the length of its search (PonderSlot.searching), and no ponder starts while a search is running.
+'''
+
+PONDER_LIMIT = 60.0     # Seconds a ponder may run if no request stops it
+
+class PonderSlot:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = None      # Ponderer whose thread may be running
+        self.searches = 0       # move searches running; no ponder starts while there are any
+
+    @contextmanager
+    def searching(self):
+        """Stops the running ponder, whichever game it belongs to, and keeps new ones from starting during the block."""
+        with self.lock:
+            self.searches += 1
+            active, self.active = self.active, None
+        if active is not None:
+            active.stop()
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.searches -= 1
+
+    def claim(self, ponderer):
+        """Makes ponderer the only one allowed to run and stops the previous one; returns False while a search runs."""
+        with self.lock:
+            if self.searches:
+                return False
+            previous, self.active = self.active, ponderer
+        if previous is not None and previous is not ponderer:
+            previous.stop()
+        return True
+
+ponder_slot = PonderSlot()  # shared by every Ponderer of the process
+
+class Ponderer:
+    def __init__(self, enabled=True, slot=ponder_slot):
+        self.enabled = enabled
+        self.slot = slot
+        self.lock = threading.Lock()    # start and stop may come from different request threads
+        self.thread = None
+        self.deadline = Deadline()
+        self.ponders = 0            # ponders started
+
+    def start(self, agent, game, move):
+        """Starts pondering on the position after move, the agent's answer to game."""
+        self.stop()
+        ponder = getattr(agent, 'ponder', None)
+        if not self.enabled or ponder is None:
+            return  # only agents with a ponder method (HybridAgent2, MCTSAgent) can think ahead
+        game = BitboardGame.from_game(game)
+        token = game.make_move(move)
+        if game.check_move_winner(token) != EMPTY:
+            return  # the game is over
+        with self.lock:
+            if not self.slot.claim(self):
+                return  # another game is searching its move and needs the core
+            self.deadline = Deadline(PONDER_LIMIT)
+            self.thread = threading.Thread(target=ponder, args=(game, self.deadline), daemon=True)
+            self.ponders += 1
+            self.thread.start()
+
+    def stop(self):
+        """Stops the running ponder (if any) and waits for it to finish."""
+        with self.lock:
+            if self.thread is None:
+                return
+            self.deadline.stop()
+            self.thread.join()
+            self.thread = None
@@ -0,0 +1,154 @@
+import asyncio
+import importlib
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+'''
+Production server for the agent endpoints (/, /start, /move, /end).
+Serves the Flask app of a player module without the development server: an asyncio event loop reads and
+writes HTTP/1.1 (with keep-alive) and every request runs the WSGI app on a thread pool, so a long search never
+blocks the loop and the health check on / is answered while a move is being computed.
+The JSON contract is the Flask app's own. Usage: python serve.py [module[:app]] [port] [host]
+'''
+
+DEFAULT_APP = 'player1:app'
+DEFAULT_PORT = 5008
+DEFAULT_HOST = '0.0.0.0'
+WORKERS = 8                 # Requests handled at the same time (searches run in these threads)
+MAX_BODY_BYTES = 1 << 20    # Largest request body accepted
+READ_TIMEOUT = 60.0         # Seconds an idle keep-alive connection is kept open
+
+##################
+
+def load_app(spec):
+    """Imports 'module:attribute' (attribute defaults to app) and returns the WSGI app."""
+    module_name, _, attribute = spec.partition(':')
+    return getattr(importlib.import_module(module_name), attribute or 'app')
+
+def call_app(app, environ):
+    """Runs the WSGI app for one request and returns (status line, headers, body)."""
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response['status'] = status
+        response['headers'] = headers
+
+    chunks = app(environ, start_response)
+    try:
+        body = b''.join(chunks)
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+    return response['status'], response['headers'], body
+
+class AgentServer:
+    def __init__(self, app, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=WORKERS):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.server = None
+
+    async def start(self):
+        """Starts listening; returns once the socket is bound."""
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"Serving on http://{self.host}:{self.port}", flush=True)
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def handle_connection(self, reader, writer):
+        """Serves the requests of one connection until the client closes it or asks to."""
+        peer = writer.get_extra_info('peername') or ('', 0)
+        try:
+            while True:
+                request = await asyncio.wait_for(self.read_request(reader), READ_TIMEOUT)
+                if request is None:
+                    break
+                method, path, version, headers, body = request
+                environ = self.make_environ(method, path, version, headers, body, peer)
+                loop = asyncio.get_running_loop()
+                status, response_headers, payload = await loop.run_in_executor(self.executor, call_app, self.app, environ)
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                self.write_response(writer, status, response_headers, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def read_request(self, reader):
+        """Returns (method, path, version, headers, body) of the next request, or None at the end of the connection."""
+        line = await reader.readline()
+        if not line:
+            return None
+        method, path, version = line.decode('latin-1').split()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get('content-length', 0))
+        if length > MAX_BODY_BYTES:
+            raise ValueError("request body too large")
+        body = await reader.readexactly(length) if length else b''
+        return method, path, version, headers, body
+
+    def make_environ(self, method, path, version, headers, body, peer):
+        """Builds the WSGI environ of a request."""
+        path, _, query = path.partition('?')
+        environ = {
+            'REQUEST_METHOD': method,
+            'SCRIPT_NAME': '',
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'SERVER_NAME': str(self.host),
+            'SERVER_PORT': str(self.port),
+            'SERVER_PROTOCOL': version,
+            'REMOTE_ADDR': peer[0],
+            'REMOTE_PORT': str(peer[1]),
+            'CONTENT_TYPE': headers.get('content-type', ''),
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        for name, value in headers.items():
+            if name not in ('content-type', 'content-length'):
+                environ['HTTP_' + name.upper().replace('-', '_')] = value
+        return environ
+
+    def write_response(self, writer, status, headers, payload, keep_alive):
+        """Writes a response with a Content-Length so the connection can be reused."""
+        lines = [f"HTTP/1.1 {status}"]
+        for name, value in headers:
+            if name.lower() not in ('content-length', 'connection'):
+                lines.append(f"{name}: {value}")
+        lines.append(f"Content-Length: {len(payload)}")
+        lines.append("Connection: " + ("keep-alive" if keep_alive else "close"))
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + payload)
+
+def main():
+    spec = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_APP
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_PORT
+    host = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_HOST
+    server = AgentServer(load_app(spec), host, port)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
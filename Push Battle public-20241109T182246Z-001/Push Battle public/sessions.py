@@ -0,0 +1,94 @@
+import threading
+import time
+from bitboard import BitboardGame
+from movegen import legal_moves
+from ponder import Ponderer
+
+'''
+Per-game sessions for the player servers.
+A session keeps everything an agent learns during one game: the agent itself (with its transposition table,
+move ordering tables or MCTS tree), its ponderer and the last position the server saw.
+Requests carry a game_id (the client's address is used when they do not), so one server can play several
+games at once. Sessions end on /end or once they have been idle for IDLE_TIMEOUT seconds.
+'''
+
+IDLE_TIMEOUT = 300.0    # Seconds without a request before a session is dropped
+
+class GameSession:
+    def __init__(self, agent, game, pondering=False):
+        self.agent = agent
+        self.game = BitboardGame.from_game(game)    # last known position of the game
+        self.ponderer = Ponderer(pondering)
+        self.lock = threading.Lock()                # one request of a game at a time
+        self.last_seen = time.monotonic()
+        self.opponent_move = None                   # the opponent's last move, when sync could tell it
+
+    def sync(self, game):
+        """Brings the session up to date with the position of a request and returns it as a BitboardGame.
+        The opponent's move is found and played on the known position; anything else reloads the position."""
+        game = BitboardGame.from_game(game)
+        self.opponent_move = None
+        if game.zobrist_key != self.game.zobrist_key:
+            known = self.game
+            for move in legal_moves(known):
+                token = known.make_move(move)
+                if known.zobrist_key == game.zobrist_key:
+                    self.opponent_move = move
+                    break
+                known.unmake_move(token)
+            else:
+                self.game = game
+        return self.game.copy()
+
+    def play(self, move):
+        """Plays the agent's move on the known position."""
+        token = self.game.make_move(move)
+        return self.game.check_move_winner(token)
+
+    def close(self):
+        """Stops any background work of the session."""
+        self.ponderer.stop()
+
+class SessionStore:
+    def __init__(self, idle_timeout=IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self.sessions = {}              # game id -> GameSession
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def start(self, game_id, session):
+        """Registers the session of a new game, replacing an older one with the same id."""
+        with self.lock:
+            old = self.sessions.pop(game_id, None)
+            self.sessions[game_id] = session
+        if old is not None:
+            old.close()
+        self.evict_idle()
+        return session
+
+    def get(self, game_id):
+        """Returns the session of a game and marks it as used, or None."""
+        with self.lock:
+            session = self.sessions.get(game_id)
+        if session is not None:
+            session.last_seen = time.monotonic()
+        self.evict_idle()
+        return session
+
+    def end(self, game_id):
+        """Drops the session of a finished game."""
+        with self.lock:
+            session = self.sessions.pop(game_id, None)
+        if session is not None:
+            session.close()
+
+    def evict_idle(self):
+        """Drops every session that has been idle for longer than idle_timeout."""
+        now = time.monotonic()
+        with self.lock:
+            idle = [game_id for game_id, session in self.sessions.items() if now - session.last_seen > self.idle_timeout]
+            evicted = [self.sessions.pop(game_id) for game_id in idle]
+        for session in evicted:
+            session.close()
@@ -0,0 +1,147 @@
+import argparse
+import math
+import time
+from judge_engine import TIMEOUT
+from tournament import parse_spec, gauntlet, play_games, candidate_score, elo_from_score, score_from_elo, MAX_TURNS, RESULTS_PATH, Z_95
+
+'''
+Sequential probability ratio test (SPRT) between two agent specs.
+Games of the candidate against the baseline (alternating colours) are played in parallel by tournament's worker
+pool, and after every finished game the log-likelihood ratio of H1 (the candidate is elo1 stronger) against
+H0 (it is elo0 stronger) is updated. The test stops as soon as the LLR leaves [log(beta / (1 - alpha)),
+log((1 - beta) / alpha)], or after max_games.
+The LLR uses the normal approximation of the generalized SPRT on win / draw / loss counts.
+'''
+
+ELO0 = 0.0              # Elo difference of H0
+ELO1 = 10.0             # Elo difference of H1
+ALPHA = 0.05            # Chance of accepting H1 when H0 holds
+BETA = 0.05             # Chance of accepting H0 when H1 holds
+MAX_GAMES = 2000        # Games after which the test gives up undecided
+PRIOR_GAMES = 1         # Virtual game, half won and half lost, so the variance is never 0 after one-sided results
+
+H0 = 'H0'               # The candidate is at most elo0 stronger
+H1 = 'H1'               # The candidate is at least elo1 stronger
+
+##################
+
+def bounds(alpha=ALPHA, beta=BETA):
+    """Returns the (lower, upper) LLR bounds at which the test accepts H0 or H1."""
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+def llr(wins, losses, draws, elo0=ELO0, elo1=ELO1):
+    """Returns the log-likelihood ratio of H1 against H0 after the given results."""
+    wins += PRIOR_GAMES / 2
+    losses += PRIOR_GAMES / 2
+    games = wins + losses + draws
+    score = (wins + 0.5 * draws) / games
+    variance = (wins * (1 - score) ** 2 + losses * score ** 2 + draws * (0.5 - score) ** 2) / games
+    s0 = score_from_elo(elo0)
+    s1 = score_from_elo(elo1)
+    return games * (s1 - s0) * (2 * score - s0 - s1) / (2 * variance)
+
+class SPRT:
+    def __init__(self, elo0=ELO0, elo1=ELO1, alpha=ALPHA, beta=BETA):
+        self.elo0 = elo0
+        self.elo1 = elo1
+        self.lower, self.upper = bounds(alpha, beta)
+        self.wins = 0       # results of the candidate
+        self.losses = 0
+        self.draws = 0
+
+    @property
+    def games(self):
+        return self.wins + self.losses + self.draws
+
+    def add(self, score):
+        """Counts one result of the candidate (1, 0.5 or 0)."""
+        if score == 1:
+            self.wins += 1
+        elif score == 0:
+            self.losses += 1
+        else:
+            self.draws += 1
+
+    def llr(self):
+        return llr(self.wins, self.losses, self.draws, self.elo0, self.elo1)
+
+    def decision(self):
+        """Returns H0 or H1 once the test has decided, otherwise None."""
+        value = self.llr()
+        if value <= self.lower:
+            return H0
+        if value >= self.upper:
+            return H1
+        return None
+
+    def score(self):
+        return (self.wins + 0.5 * self.draws) / self.games if self.games else 0.5
+
+    def elo(self):
+        """Returns the measured Elo difference and the half-width of its 95% interval."""
+        if self.games < 2:
+            return elo_from_score(self.score()), float('inf')
+        # the same prior as llr, so a one-sided sample still has a score inside (0, 1) and a non-zero variance
+        wins = self.wins + PRIOR_GAMES / 2
+        losses = self.losses + PRIOR_GAMES / 2
+        games = wins + losses + self.draws
+        score = (wins + 0.5 * self.draws) / games
+        variance = (wins * (1 - score) ** 2 + losses * score ** 2 + self.draws * (0.5 - score) ** 2) / games
+        error = math.sqrt(variance / games)
+        return elo_from_score(score), (elo_from_score(score + Z_95 * error) - elo_from_score(score - Z_95 * error)) / 2
+
+    def report(self):
+        elo, margin = self.elo()
+        return (f"games {self.games} (W-L-D {self.wins}-{self.losses}-{self.draws})  score {100 * self.score():.1f}%  "
+                f"elo {elo:+.1f} +/- {margin:.1f}  LLR {self.llr():.2f} [{self.lower:.2f}, {self.upper:.2f}]")
+
+def run_sprt(candidate, baseline, test=None, max_games=MAX_GAMES, workers=None, seed=None, timeout=TIMEOUT,
+             max_turns=MAX_TURNS, path=None, progress=None):
+    """Plays candidate against baseline until the test decides or max_games are played.
+    Returns the SPRT with its counts and the decision (H0, H1 or None when max_games ran out)."""
+    test = test if test is not None else SPRT()
+    decision = None
+    games = play_games(gauntlet([candidate, baseline], max_games), workers, seed, timeout, max_turns, path)
+    try:
+        for record in games:
+            test.add(candidate_score(record))
+            if progress is not None:
+                progress(test)
+            decision = test.decision()
+            if decision is not None:
+                break
+    finally:
+        games.close()  # stops the games still being played
+    return test, decision
+
+def main():
+    parser = argparse.ArgumentParser(description="Tests whether a candidate agent spec is stronger than a baseline.")
+    parser.add_argument('candidate', help='agent spec, e.g. "HybridAgent2(depth=32, time_limit=0.2, pair_weight=8)"')
+    parser.add_argument('baseline', help='agent spec, e.g. "HybridAgent2(depth=32, time_limit=0.2)"')
+    parser.add_argument('--elo0', type=float, default=ELO0)
+    parser.add_argument('--elo1', type=float, default=ELO1)
+    parser.add_argument('--alpha', type=float, default=ALPHA)
+    parser.add_argument('--beta', type=float, default=BETA)
+    parser.add_argument('--max-games', type=int, default=MAX_GAMES)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per core)')
+    parser.add_argument('--timeout', type=float, default=TIMEOUT, help='seconds per move')
+    parser.add_argument('--max-turns', type=int, default=MAX_TURNS, help='turns before a draw is called')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--out', default=RESULTS_PATH, help='JSON lines file the game records are appended to')
+    args = parser.parse_args()
+
+    parse_spec(args.candidate)
+    parse_spec(args.baseline)
+    start = time.perf_counter()
+    test, decision = run_sprt(args.candidate, args.baseline, SPRT(args.elo0, args.elo1, args.alpha, args.beta), args.max_games,
+                              args.workers, args.seed, args.timeout, args.max_turns, args.out, lambda test: print(test.report()))
+    print(f"\n{test.games} games in {time.perf_counter() - start:.1f}s")
+    if decision == H1:
+        print(f"H1 accepted: {args.candidate} is stronger (elo >= {args.elo1:g})")
+    elif decision == H0:
+        print(f"H0 accepted: {args.candidate} is not stronger (elo <= {args.elo0:g})")
+    else:
+        print("Inconclusive: max games reached")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+import numpy as np
+from PushBattle import PLAYER1, PLAYER2, BOARD_SIZE, ZOBRIST_PIECES, ZOBRIST_SIDE, ZOBRIST_P1_COUNT, ZOBRIST_P2_COUNT
+from bitboard import NUM_CELLS, iter_bits
+
+'''
+Symmetries of the Push Battle board.
+The board is a torus, so every translation combined with one of the 8 rotations / reflections of the square
+maps legal positions to legal positions with the same pushes and the same three in a rows: 512 transforms.
+Transform t = dihedral * 64 + dr * 8 + dc first applies the rotation / reflection, then shifts by (dr, dc).
+canonical maps a position to the representative all its symmetric copies share, and unique_moves drops the
+root moves that lead to symmetric copies of each other.
+'''
+
+# The 8 rotations / reflections of the square as (r, c) -> (r', c') around cell (0, 0)
+DIHEDRAL = [
+    lambda r, c: (r, c),
+    lambda r, c: (c, -r),
+    lambda r, c: (-r, -c),
+    lambda r, c: (-c, r),
+    lambda r, c: (r, -c),
+    lambda r, c: (-r, c),
+    lambda r, c: (c, r),
+    lambda r, c: (-c, -r),
+]
+
+NUM_TRANSFORMS = len(DIHEDRAL) * NUM_CELLS     # 512
+IDENTITY = 0                                   # Transform that leaves every cell in place
+
+def _build_permutations():
+    """Returns the (NUM_TRANSFORMS, 64) table of the cell every cell is sent to."""
+    permutations = np.zeros((NUM_TRANSFORMS, NUM_CELLS), dtype=np.intp)
+    for d, dihedral in enumerate(DIHEDRAL):
+        for shift in range(NUM_CELLS):
+            dr, dc = divmod(shift, BOARD_SIZE)
+            for cell in range(NUM_CELLS):
+                r, c = dihedral(*divmod(cell, BOARD_SIZE))
+                permutations[d * NUM_CELLS + shift, cell] = ((r + dr) % BOARD_SIZE) * BOARD_SIZE + (c + dc) % BOARD_SIZE
+    return permutations
+
+PERMUTATIONS = _build_permutations()                # PERMUTATIONS[t, cell] is where t sends cell
+SOURCES = np.argsort(PERMUTATIONS, axis=1)          # SOURCES[t, cell] is the cell t sends to cell
+INVERSE = [int(np.flatnonzero((PERMUTATIONS == SOURCES[t]).all(axis=1))[0]) for t in range(NUM_TRANSFORMS)]
+
+##################
+
+def transform_cell(cell, t):
+    """Returns the cell that t sends cell to."""
+    return int(PERMUTATIONS[t, cell])
+
+def transform_move(move, t):
+    """Returns the (r, c) / (r0, c0, r1, c1) move that t sends move to."""
+    moved = []
+    for i in range(0, len(move), 2):
+        moved.extend(divmod(int(PERMUTATIONS[t, move[i] * BOARD_SIZE + move[i + 1]]), BOARD_SIZE))
+    return tuple(moved)
+
+def transform_mask(mask, t):
+    """Returns the occupancy mask that t sends mask to."""
+    permutation = PERMUTATIONS[t]
+    moved = 0
+    for cell in iter_bits(mask):
+        moved |= 1 << int(permutation[cell])
+    return moved
+
+def _all_images(game):
+    """Returns the (p1, p2) masks of the position under every transform, as two uint64 arrays."""
+    flat = np.asarray(game.board).reshape(NUM_CELLS)
+    images = flat[SOURCES]      # images[t, cell] is what t puts on cell
+    p1 = np.packbits(images == PLAYER1, axis=1, bitorder='little').view('<u8')[:, 0]
+    p2 = np.packbits(images == PLAYER2, axis=1, bitorder='little').view('<u8')[:, 0]
+    return p1, p2
+
+def canonical(game):
+    """Returns (p1 mask, p2 mask, t): the smallest image of the position and the transform that produces it."""
+    p1, p2 = _all_images(game)
+    t = int(np.lexsort((p2, p1))[0])
+    return int(p1[t]), int(p2[t]), t
+
+def canonical_key(game):
+    """Returns (zobrist key of the canonical position, t); symmetric positions share the key."""
+    p1, p2, t = canonical(game)
+    key = ZOBRIST_P1_COUNT[game.p1_pieces] ^ ZOBRIST_P2_COUNT[game.p2_pieces]
+    if game.current_player == PLAYER2:
+        key ^= ZOBRIST_SIDE
+    for cell in iter_bits(p1):
+        key ^= ZOBRIST_PIECES[PLAYER1][cell]
+    for cell in iter_bits(p2):
+        key ^= ZOBRIST_PIECES[PLAYER2][cell]
+    return key, t
+
+def stabilizer(game):
+    """Returns the transforms that map the position onto itself."""
+    p1, p2 = _all_images(game)
+    return np.flatnonzero((p1 == p1[IDENTITY]) & (p2 == p2[IDENTITY])).tolist()
+
+def unique_moves(game, moves):
+    """Returns moves without the ones that lead to a symmetric copy of an earlier move's position."""
+    symmetries = stabilizer(game)
+    if len(symmetries) == 1:
+        return moves
+    seen = set()
+    unique = []
+    for move in moves:
+        # moves related by a symmetry of the position lead to symmetric positions
+        representative = min(transform_move(move, t) for t in symmetries)
+        if representative not in seen:
+            seen.add(representative)
+            unique.append(move)
+    return unique
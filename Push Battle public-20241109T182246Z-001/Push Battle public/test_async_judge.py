@@ -0,0 +1,54 @@
+import asyncio
+from flask import Flask, request, jsonify
+from PushBattle import Game
+from random_agent import RandomAgent
+from serve import AgentServer
+from async_judge import run_games
+
+'''
+Tests of async_judge against agent servers running in the test's own event loop.
+'''
+
+def agent_app(broken=False):
+    """Returns a Flask app that plays random moves, or answers every move with one handle_move cannot read."""
+    app = Flask(__name__)
+
+    @app.route('/', methods=['GET'])
+    def index():
+        return "ok"
+
+    @app.route('/start', methods=['POST'])
+    @app.route('/end', methods=['POST'])
+    def start_or_end():
+        return jsonify({'status': 'ok'})
+
+    @app.route('/move', methods=['POST'])
+    def move():
+        if broken:
+            return jsonify({'move': ['x', 'y']})
+        game = Game.from_dict(request.get_json()['game'])
+        return jsonify({'move': [int(x) for x in RandomAgent(game.current_player).get_best_move(game)]})
+
+    return app
+
+async def run(pairings_of):
+    servers = [AgentServer(agent_app(), '127.0.0.1', 0), AgentServer(agent_app(broken=True), '127.0.0.1', 0)]
+    for server in servers:
+        await server.start()
+    good, broken = (f"http://127.0.0.1:{server.port}" for server in servers)
+    try:
+        return good, broken, await run_games(pairings_of(good, broken), concurrency=4, max_turns=40)
+    finally:
+        for server in servers:
+            server.server.close()
+
+def test_a_game_that_raises_is_recorded_and_the_others_finish():
+    good, broken, records = asyncio.run(run(lambda good, broken: [(good, good), (good, broken), (broken, good), (good, good)]))
+    assert sorted(record['game'] for record in records) == [0, 1, 2, 3]
+    for record in records:
+        if broken in (record['p1'], record['p2']):
+            assert record['error'].startswith('TypeError')
+            assert record['game_id']
+        else:
+            assert 'error' not in record
+            assert record['winner'] in (-1, 0, 1)
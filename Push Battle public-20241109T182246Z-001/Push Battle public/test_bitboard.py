@@ -0,0 +1,40 @@
+import random
+import numpy as np
+from PushBattle import Game
+from bitboard import BitboardGame
+from movegen import legal_moves
+
+'''
+Tests that BitboardGame plays exactly like Game.
+'''
+
+def test_checker_methods_return_the_same_cells_as_game():
+    rng = random.Random(0)
+    for _ in range(50):
+        game, bitboard = Game(), BitboardGame()
+        for _ in range(60):
+            move = rng.choice(legal_moves(bitboard))
+            if len(move) == 2:
+                cells, bitboard_cells = game.place_checker(*move), bitboard.place_checker(*move)
+            else:
+                cells, bitboard_cells = game.move_checker(*move), bitboard.move_checker(*move)
+            assert bitboard_cells == cells
+            assert np.array_equal(bitboard.board, game.board)
+            assert bitboard.zobrist_board == game.zobrist_board
+            assert bitboard.check_winner_at(cells) == game.check_winner_at(cells)
+            if game.check_winner() != 0:
+                break
+            for g in (game, bitboard):
+                g.turn_count += 1
+                g.current_player = -g.current_player
+
+def test_make_move_winner_matches_game():
+    rng = random.Random(1)
+    for _ in range(50):
+        game, bitboard = Game(), BitboardGame()
+        for _ in range(60):
+            move = rng.choice(legal_moves(bitboard))
+            token, bitboard_token = game.make_move(move), bitboard.make_move(move)
+            assert bitboard.check_move_winner(bitboard_token) == game.check_move_winner(token)
+            if game.check_winner() != 0:
+                break
@@ -0,0 +1,47 @@
+from PushBattle import Game, PLAYER1
+from evaluation import child_heuristics
+from hybrid_agent2 import HybridAgent2
+
+'''
+Tests of HybridAgent2's choice among the searched root moves.
+'''
+
+LOSS = float('-inf')
+
+def opening():
+    game = Game()
+    for move in ([0, 0], [4, 4], [0, 3], [5, 1]):
+        game.make_move(move)
+    return game
+
+def agent_with_values(values_of):
+    """Returns an agent whose root search gives the values values_of(moves, heuristic values) picks."""
+    agent = HybridAgent2(PLAYER1, depth=2, tactics=False, symmetry_pruning=False)
+    agent.search_root = lambda game, moves, depth: values_of(moves, child_heuristics(game, moves, *agent.weights))
+    return agent
+
+def test_drop_losing_moves_keeps_the_moves_not_proven_lost():
+    agent = HybridAgent2(PLAYER1)
+    moves, values, heuristics = agent.drop_losing_moves([[0, 1], [0, 2], [0, 3]], [LOSS, 2, LOSS], [9, 1, 8])
+    assert (moves, values, heuristics) == ([[0, 2]], [2], [1])
+
+def test_drop_losing_moves_keeps_everything_when_every_move_loses():
+    agent = HybridAgent2(PLAYER1)
+    assert agent.drop_losing_moves([[0, 1], [0, 2]], [LOSS, LOSS], [9, 1]) == ([[0, 1], [0, 2]], [LOSS, LOSS], [9, 1])
+
+def test_the_heuristic_never_picks_a_move_the_search_proved_lost():
+    best_heuristic = []
+
+    def values_of(moves, heuristics):
+        # every move the heuristic rates highest is a proven loss
+        top = max(heuristics)
+        best_heuristic[:] = [move for move, value in zip(moves, heuristics) if value == top]
+        return [LOSS if value == top else 0 for value in heuristics]
+
+    move = agent_with_values(values_of).get_best_move(opening())
+    assert move not in best_heuristic
+
+def test_a_move_is_still_played_when_every_move_loses():
+    game = opening()
+    move = agent_with_values(lambda moves, heuristics: [LOSS] * len(moves)).get_best_move(game)
+    assert game.is_valid_placement(*move)
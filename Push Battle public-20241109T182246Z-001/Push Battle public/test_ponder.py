@@ -0,0 +1,45 @@
+import threading
+from PushBattle import Game, PLAYER1
+from ponder import Ponderer, PonderSlot
+
+'''
+Tests that pondering never competes with another ponder or with a move search for the core.
+'''
+
+class SpinningAgent:
+    """An agent whose ponder runs until its deadline is stopped."""
+    def __init__(self):
+        self.running = threading.Event()
+
+    def ponder(self, game, deadline):
+        self.running.set()
+        while not deadline.expired():
+            pass
+        self.running.clear()
+
+def start(ponderer, agent):
+    ponderer.start(agent, Game(), [0, 0])
+    return ponderer.thread
+
+def test_only_one_ponder_runs_at_a_time():
+    slot = PonderSlot()
+    first, second = Ponderer(slot=slot), Ponderer(slot=slot)
+    first_agent = SpinningAgent()
+    start(first, first_agent)
+    assert first_agent.running.wait(5)
+    start(second, SpinningAgent())
+    assert first.thread is None and not first_agent.running.is_set()
+    assert second.thread is not None
+    second.stop()
+
+def test_a_search_stops_every_ponder_and_none_starts_during_it():
+    slot = PonderSlot()
+    other, own = Ponderer(slot=slot), Ponderer(slot=slot)
+    agent = SpinningAgent()
+    start(other, agent)
+    assert agent.running.wait(5)
+    with slot.searching():
+        assert other.thread is None and not agent.running.is_set()
+        assert start(other, SpinningAgent()) is None
+    assert start(own, SpinningAgent()) is not None
+    own.stop()
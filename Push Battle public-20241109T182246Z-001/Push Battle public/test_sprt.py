@@ -0,0 +1,28 @@
+import math
+from sprt import SPRT, H1
+
+'''
+Tests of the SPRT statistics in sprt.py.
+'''
+
+def test_elo_of_all_wins_is_finite_with_a_non_zero_margin():
+    test = SPRT()
+    for _ in range(20):
+        test.add(1)
+    elo, margin = test.elo()
+    assert 0 < elo < 2400
+    assert 0 < margin < math.inf
+
+def test_elo_of_all_losses_mirrors_all_wins():
+    wins, losses = SPRT(), SPRT()
+    for _ in range(20):
+        wins.add(1)
+        losses.add(0)
+    assert math.isclose(wins.elo()[0], -losses.elo()[0])
+    assert math.isclose(wins.elo()[1], losses.elo()[1])
+
+def test_one_sided_results_accept_h1():
+    test = SPRT()
+    while test.decision() is None:
+        test.add(1)
+    assert test.decision() == H1
@@ -0,0 +1,82 @@
+import random
+from PushBattle import Game, PLAYER1, PLAYER2, EMPTY, NUM_PIECES
+from bitboard import BitboardGame
+from movegen import legal_moves
+from threats import ThreatIndex, find_threats
+import hybrid_agent2
+
+'''
+Tests that ThreatIndex, kept up to date through push / pop, always agrees with a fresh find_threats scan.
+'''
+
+def fresh_threats(game, player):
+    own, other = (game.p1_mask, game.p2_mask) if player == PLAYER1 else (game.p2_mask, game.p1_mask)
+    pieces = game.p1_pieces if player == PLAYER1 else game.p2_pieces
+    return find_threats(own, other, pieces < NUM_PIECES)
+
+def assert_matches_scan(index, game):
+    for player in (PLAYER1, PLAYER2):
+        assert index.threats(player) == fresh_threats(game, player)
+
+def test_incremental_threats_match_a_fresh_scan_after_random_make_unmake():
+    rng = random.Random(14)
+    for _ in range(12):
+        game = BitboardGame.from_game(Game())
+        index = ThreatIndex(game)
+        tokens = []
+        for _ in range(200):
+            if tokens and (rng.random() < 0.4 or len(tokens) > 40):
+                index.pop()
+                game.unmake_move(tokens.pop())
+            else:
+                token = game.make_move(rng.choice(legal_moves(game)))
+                if game.check_move_winner(token) != EMPTY:
+                    game.unmake_move(token)
+                    continue
+                index.push(token)
+                tokens.append(token)
+            # query only some positions, so updates also pile up over several moves
+            if rng.random() < 0.5:
+                assert_matches_scan(index, game)
+        while tokens:
+            index.pop()
+            game.unmake_move(tokens.pop())
+            assert_matches_scan(index, game)
+
+def test_a_move_rescans_fewer_destinations_than_a_full_scan():
+    rng = random.Random(3)
+    game = BitboardGame.from_game(Game())
+    for _ in range(30):
+        token = game.make_move(rng.choice(legal_moves(game)))
+        if game.check_move_winner(token) != EMPTY:
+            game.unmake_move(token)
+    index = ThreatIndex(game)
+    scans, moves = index.scans, 0
+    for move in legal_moves(game):
+        token = game.make_move(move)
+        if game.check_move_winner(token) == EMPTY:
+            index.push(token)
+            index.threats(game.current_player)
+            index.pop()
+            moves += 1
+        game.unmake_move(token)
+    assert (index.scans - scans) / moves < 64
+
+def test_the_search_finds_the_same_values_with_and_without_the_index(monkeypatch):
+    threat_depth = hybrid_agent2.THREAT_DEPTH
+    # positions where the search below the root meets immediate wins
+    for seed, plies in ((5, 10), (5, 20)):
+        rng = random.Random(seed)
+        game = BitboardGame.from_game(Game())
+        for _ in range(plies):
+            token = game.make_move(rng.choice(legal_moves(game)))
+            if game.check_move_winner(token) != EMPTY:
+                game.unmake_move(token)
+        values, scans = [], []
+        for depth in (threat_depth, 99):
+            monkeypatch.setattr(hybrid_agent2, 'THREAT_DEPTH', depth)
+            agent = hybrid_agent2.HybridAgent2(game.current_player, depth=5, tactics=False)
+            values.append(agent.search_root(game.copy(), agent.get_root_moves(game), 5))
+            scans.append(agent.threat_index.scans)
+        assert values[0] == values[1]
+        assert scans[0] > 2 * 64 == scans[1]  # the index is only updated below the root when minimax uses it
@@ -0,0 +1,117 @@
+from PushBattle import PLAYER1, PLAYER2, EMPTY
+from bitboard import BitboardGame, FULL_MASK, completion_cells
+from movegen import legal_moves
+from threats import ThreatIndex
+from deadline import Deadline, SearchTimeout
+
+'''
+Threat-space solver: looks for forced wins made only of forcing moves.
+The attacker only plays moves that leave it an immediate win, so the defender has to answer with one of the
+moves that stop it (ThreatIndex.blocking_moves). Every defence is searched, so a win found is a real forced win;
+attacking moves are narrowed to the ones that line up a possible three in a row, so some wins can be missed.
+Depth is counted in attacker moves: a mate in N ends with the attacker's N-th move.
+'''
+
+MAX_DEPTH = 3           # Longest mate searched for, in attacker moves
+NODE_LIMIT = 5000       # Positions the solver may visit per solve
+
+class ThreatSpaceSolver:
+    def __init__(self, max_depth=MAX_DEPTH, node_limit=NODE_LIMIT):
+        self.max_depth = max_depth
+        self.node_limit = node_limit    # None for no limit
+        self.deadline = Deadline()
+        self.nodes = 0                  # positions visited by the last solve
+        self.failed = {}                # zobrist key -> deepest mate the attacker was shown not to have there
+        self.index = None               # ThreatIndex following the position being solved
+
+    def solve(self, game, deadline=None):
+        """Returns the principal variation of a forced win for the player to move (ending with the winning move), or None."""
+        game = BitboardGame.from_game(game)  # search on a private bitboard copy using make/unmake
+        self.deadline = deadline if deadline is not None else Deadline()
+        self.nodes = 0
+        self.failed = {}
+        for depth in range(1, self.max_depth + 1):
+            try:
+                # an interrupted search leaves its moves on the board, so every iteration gets its own copy
+                position = game.copy()
+                self.index = ThreatIndex(position)
+                pv = self.attack(position, depth)
+            except SearchTimeout:
+                return None
+            if pv is not None:
+                return pv
+        return None
+
+    def visit(self):
+        """Counts a position and stops the solve once the node or time budget is spent."""
+        self.nodes += 1
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise SearchTimeout()
+        self.deadline.check()
+
+    def forcing_moves(self, game):
+        """Returns the attacker's moves that leave a possible three in a row on the board."""
+        attacker = game.current_player
+        moves = []
+        for move in legal_moves(game):
+            token = game.make_move(move)
+            own, other = (game.p1_mask, game.p2_mask) if attacker == PLAYER1 else (game.p2_mask, game.p1_mask)
+            if completion_cells(own) & (FULL_MASK ^ (own | other)) and game.check_move_winner(token) == EMPTY:
+                moves.append(move)
+            game.unmake_move(token)
+        return moves
+
+    def attack(self, game, depth):
+        """Returns the principal variation of a mate in at most depth for the player to move, or None."""
+        self.visit()
+        winning_moves = self.index.winning_moves(game.current_player)
+        if winning_moves:
+            return [winning_moves[0]]
+        key = game.zobrist_key
+        if depth <= 1 or self.failed.get(key, 0) >= depth:
+            return None
+
+        for move in self.forcing_moves(game):
+            token = game.make_move(move)
+            self.index.push(token)
+            pv = self.defend(game, depth - 1)
+            self.index.pop()
+            game.unmake_move(token)
+            if pv is not None:
+                return [move] + pv
+        self.failed[key] = depth
+        return None
+
+    def defend(self, game, depth):
+        """Returns the longest defence against the attacker's threat if the attacker still mates in depth, or None."""
+        self.visit()
+        defender = game.current_player
+        attacker = PLAYER2 if defender == PLAYER1 else PLAYER1
+        index = self.index
+        if index.has_immediate_win(defender) or not index.has_immediate_win(attacker):
+            return None     # the defender wins first, or there is nothing to answer
+
+        blocks = index.blocking_moves()
+        if not blocks:
+            # no answer stops the threat: any reply, then the win
+            reply = legal_moves(game)[0]
+            token = game.make_move(reply)
+            winner = game.check_move_winner(token)
+            index.push(token)
+            pv = [reply] if winner == attacker else [reply, index.winning_moves(attacker)[0]]
+            index.pop()
+            game.unmake_move(token)
+            return pv
+
+        longest = None
+        for block in blocks:
+            token = game.make_move(block)
+            index.push(token)
+            pv = None if game.check_move_winner(token) == defender else self.attack(game, depth)
+            index.pop()
+            game.unmake_move(token)
+            if pv is None:
+                return None
+            if longest is None or len(pv) + 1 > len(longest):
+                longest = [block] + pv
+        return longest
@@ -0,0 +1,224 @@
+from PushBattle import PLAYER1, PLAYER2, NUM_PIECES
+from bitboard import NUM_CELLS, FULL_MASK, PUSH_TABLE, CELL_WINDOW_MASKS, iter_bits
+from movegen import PLACEMENT_TUPLES, MOVEMENT_TUPLES, CELL_BITS, legal_moves
+
+'''
+Threat index for a BitboardGame.
+A threat of a player is a move (pushes included) that would give that player three in a row right away.
+find_threats scans every empty destination of a position from scratch. ThreatIndex keeps the same scan per
+destination, together with the cells that scan read, and follows the search through push(token) / pop()
+around game.make_move / unmake_move: a move only rescans the destinations whose read cells it changed, and
+pop restores the previous position's tables. "Can X win next move" is then answered from the tables.
+A movement threat is found once per destination: the source only matters when it is one of the pieces
+the move would push (or the cell it would push into), or when it is part of the line.
+'''
+
+# PUSH_ZONE[cell] has the 16 cells a piece put on cell can push from or into
+PUSH_ZONE = [sum(b1 | b2 for b1, b2, _, _ in pushes) for pushes in PUSH_TABLE]
+
+def _build_line_cells():
+    """Precomputes, for every cell, the mask of the cells of every window through it."""
+    table = []
+    for windows in CELL_WINDOW_MASKS:
+        cells = 0
+        for window in windows:
+            cells |= window
+        table.append(cells)
+    return table
+
+LINE_CELLS = _build_line_cells()
+
+##################
+
+def play_masks(own, other, src_bit, dst):
+    """Returns (own, other, landed) after own puts a piece on cell dst (taking it from src_bit, 0 for a placement).
+    landed has the cells own newly occupies."""
+    own = (own & ~src_bit) | (1 << dst)
+    occupied = own | other
+    new_own, new_other = own, other
+    landed = 1 << dst
+    for b1, b2, _, _ in PUSH_TABLE[dst]:
+        if occupied & b1 and not occupied & b2:
+            if own & b1:
+                new_own ^= b1 | b2
+                landed |= b2
+            else:
+                new_other ^= b1 | b2
+    return new_own, new_other, landed
+
+def completed_windows(own, landed):
+    """Returns the masks of own's three in a rows that pass through a cell in landed."""
+    windows = []
+    for cell in iter_bits(landed & own):
+        for window in CELL_WINDOW_MASKS[cell]:
+            if own & window == window and window not in windows:
+                windows.append(window)
+    return windows
+
+def windows_through(landed):
+    """Returns the cells of every window through a cell in landed (what completed_windows may read)."""
+    cells = 0
+    for cell in iter_bits(landed):
+        cells |= LINE_CELLS[cell]
+    return cells
+
+def scan_destination(own, other, placement, dst):
+    """Returns (near, far, read) for the moves of own's owner onto cell dst.
+    near lists the [(move code, support)] of threats whose source is in the push zone (or of placements); far is
+    (support, cells in every line) when a piece from outside the zone wins on dst (any such source not in every line
+    does), else None; read has every cell the result depends on, besides which of own's pieces lie outside the zone."""
+    if (own | other) & 1 << dst:
+        return [], None, 1 << dst
+    zone = PUSH_ZONE[dst]
+    read = zone | 1 << dst
+    near = []
+    if placement:
+        new_own, _, landed = play_masks(own, other, 0, dst)
+        read |= windows_through(landed)
+        windows = completed_windows(new_own, landed)
+        if windows:
+            near.append((dst, _support(windows, zone, dst)))
+        return near, None, read
+
+    # sources that take part in the pushes are played out exactly
+    for src in iter_bits(own & zone):
+        new_own, _, landed = play_masks(own, other, 1 << src, dst)
+        read |= windows_through(landed)
+        windows = completed_windows(new_own, landed)
+        if windows:
+            near.append((src << CELL_BITS | dst, _support(windows, zone, dst) | 1 << src))
+
+    # every other source leaves the pushes alone, so the move wins unless the source is in every line
+    new_own, _, landed = play_masks(own, other, 0, dst)
+    read |= windows_through(landed)
+    windows = completed_windows(new_own, landed)
+    far = None
+    if windows:
+        in_every_line = FULL_MASK
+        for window in windows:
+            in_every_line &= window
+        far = (_support(windows, zone, dst), in_every_line)
+    return near, far, read
+
+def far_threats(own, dst, far):
+    """Returns the [(move code, support)] of the far part of a scan_destination result, for own's current pieces."""
+    support, in_every_line = far
+    return [(src << CELL_BITS | dst, support | 1 << src) for src in iter_bits(own & ~PUSH_ZONE[dst] & ~in_every_line)]
+
+def find_threats(own, other, placement):
+    """Returns [(move code, support mask)] of every move that wins on the spot for the owner of own.
+    The support of a threat holds the cells a reply has to change to stop it."""
+    threats = []
+    for dst in iter_bits(FULL_MASK ^ (own | other)):
+        near, far, _ = scan_destination(own, other, placement, dst)
+        threats += near
+        if far is not None:
+            threats += far_threats(own, dst, far)
+    return threats
+
+def _support(windows, zone, dst):
+    """Returns the cells a threat depends on: its lines, its push zone and its destination."""
+    support = zone | 1 << dst
+    for window in windows:
+        support |= window
+    return support
+
+class ThreatIndex:
+    def __init__(self, game):
+        self.game = game        # BitboardGame the index follows
+        self.tables = {}        # player -> (placement, [(near, far) per cell], [read cells per cell]) of scan_destination
+        self.pending = {PLAYER1: 0, PLAYER2: 0}  # player -> cells changed since their table was brought up to date
+        self.cache = {}         # player -> threats of the current position
+        self.stack = []         # (pending, cache, replaced tables) of the positions below the current one, restored by pop
+        self.scans = 0          # destinations scanned, to see how much the incremental updates save
+        # tables built below the starting position are dropped by pop, so build the starting ones now
+        for player in (PLAYER1, PLAYER2):
+            self.table(player)
+
+    def push(self, token):
+        """Follows game.make_move(move) == token: marks the cells the move changed for the next update."""
+        # the token keeps the masks from before the move, so their difference is every cell the move changed
+        changed = (token[7] ^ self.game.p1_mask) | (token[8] ^ self.game.p2_mask)
+        self.stack.append((dict(self.pending), self.cache, []))
+        self.cache = {}
+        for player in self.pending:
+            self.pending[player] |= changed
+
+    def pop(self):
+        """Follows game.unmake_move: returns to the tables of the previous position."""
+        self.pending, self.cache, replaced = self.stack.pop()
+        for player, table in reversed(replaced):
+            self.tables[player] = table
+
+    def table(self, player):
+        """Returns player's table for the current position, rescanning only the destinations whose read cells changed."""
+        game = self.game
+        own, other = (game.p1_mask, game.p2_mask) if player == PLAYER1 else (game.p2_mask, game.p1_mask)
+        placement = (game.p1_pieces if player == PLAYER1 else game.p2_pieces) < NUM_PIECES
+        table = self.tables.get(player)
+        changed = self.pending[player]
+        if table is not None and table[0] == placement:
+            if not changed:
+                return table
+            entries, reads = list(table[1]), list(table[2])
+            dirty = [dst for dst in range(NUM_CELLS) if reads[dst] & changed]
+        else:
+            # the first query, or the player just placed their last piece: scan the whole board
+            entries, reads = [None] * NUM_CELLS, [0] * NUM_CELLS
+            dirty = range(NUM_CELLS)
+        for dst in dirty:
+            near, far, reads[dst] = scan_destination(own, other, placement, dst)
+            entries[dst] = (near, far) if near or far is not None else None
+        self.scans += len(dirty)
+        if self.stack:
+            self.stack[-1][2].append((player, table))
+        self.tables[player] = table = (placement, entries, reads)
+        self.pending[player] = 0
+        return table
+
+    def threats(self, player):
+        """Returns [(move code, support mask)] of player's immediate wins in the current position."""
+        threats = self.cache.get(player)
+        if threats is None:
+            own = self.game.p1_mask if player == PLAYER1 else self.game.p2_mask
+            threats = []
+            for dst, entry in enumerate(self.table(player)[1]):
+                if entry is not None:
+                    near, far = entry
+                    threats += near
+                    if far is not None:
+                        threats += far_threats(own, dst, far)
+            self.cache[player] = threats
+        return threats
+
+    def has_immediate_win(self, player):
+        """Returns True if player would win with one move if it were their turn."""
+        return bool(self.threats(player))
+
+    def winning_moves(self, player):
+        """Returns player's immediate wins as (r, c) / (r0, c0, r1, c1) tuples."""
+        pieces = self.game.p1_pieces if player == PLAYER1 else self.game.p2_pieces
+        tuples = PLACEMENT_TUPLES if pieces < NUM_PIECES else MOVEMENT_TUPLES
+        return [tuples[code] for code, _ in self.threats(player)]
+
+    def blocking_moves(self, moves=None):
+        """Returns the moves of the player to move after which the opponent has no immediate win."""
+        game = self.game
+        opponent = PLAYER2 if game.current_player == PLAYER1 else PLAYER1
+        if moves is None:
+            moves = legal_moves(game)
+        threats = self.threats(opponent)
+        if not threats:
+            return list(moves)
+        blocks = []
+        for move in moves:
+            token = game.make_move(move)
+            changed = (token[7] ^ game.p1_mask) | (token[8] ^ game.p2_mask)
+            # a reply that leaves the support of some threat untouched cannot stop it
+            if all(changed & support for _, support in threats) and game.check_move_winner(token) != opponent:
+                self.push(token)
+                if not self.has_immediate_win(opponent):
+                    blocks.append(move)
+                self.pop()
+            game.unmake_move(token)
+        return blocks
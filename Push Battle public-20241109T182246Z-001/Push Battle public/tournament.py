@@ -0,0 +1,236 @@
+import os
+os.environ.setdefault('OMP_NUM_THREADS', '1')  # one core per game: keep numpy from starting thread pools in the workers
+
+import argparse
+import ast
+import json
+import math
+import random
+import time
+from multiprocessing import Pool
+import numpy as np
+from PushBattle import PLAYER1, PLAYER2, EMPTY
+from judge_engine import TIMEOUT
+from local_judge import play_match
+from random_agent import RandomAgent
+from minimax_agent import MinimaxAgent
+from alphabeta_agent import AlphaBetaAgent
+from hybrid_agent import HybridAgent
+from hybrid_agent2 import HybridAgent2
+from mcts_agent import MCTSAgent
+from reinforcementq_agent import QLearningAgent
+
+'''
+Round-robin and gauntlet tournaments between agent configurations.
+Agents are given as specs such as "RandomAgent" or "HybridAgent2(depth=32, time_limit=0.5)". Every game is
+played by local_judge in a worker process of its own (one core per game, as in the competition), each pairing
+is played with both colours, and results are appended to a JSON lines file as games finish.
+The standings give every agent's Elo (Bradley-Terry maximum likelihood, centred on 0) with a 95% interval.
+'''
+
+AGENTS = {cls.__name__: cls for cls in (RandomAgent, MinimaxAgent, AlphaBetaAgent, HybridAgent, HybridAgent2, MCTSAgent, QLearningAgent)}
+
+GAMES_PER_PAIR = 2      # Games of every pairing, half with each colour
+MAX_TURNS = 200         # Turns after which a game is scored as a draw
+RESULTS_PATH = 'tournament_results.jsonl'
+Z_95 = 1.96             # Normal quantile of a two-sided 95% interval
+VIRTUAL_DRAWS = 1       # Draws added to every pairing so ratings stay finite when one side scores 0%
+
+##################
+
+def parse_spec(spec):
+    """Returns (agent class, keyword arguments) for a spec like "AlphaBetaAgent(depth=2)"."""
+    node = ast.parse(spec.strip(), mode='eval').body
+    if isinstance(node, ast.Name):
+        name, kwargs = node.id, {}
+    elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.args:
+        name = node.func.id
+        kwargs = {keyword.arg: ast.literal_eval(keyword.value) for keyword in node.keywords}
+    else:
+        raise ValueError(f"bad agent spec {spec!r}: expected Name or Name(key=value, ...)")
+    if name not in AGENTS:
+        raise ValueError(f"unknown agent {name!r}; known agents: {', '.join(AGENTS)}")
+    return AGENTS[name], kwargs
+
+def make_agent(spec, player):
+    """Creates the agent of a spec for player."""
+    cls, kwargs = parse_spec(spec)
+    return cls(player=player, **kwargs)
+
+def round_robin(specs, games=GAMES_PER_PAIR):
+    """Returns the (p1 spec, p2 spec) games of a round robin, alternating colours within every pairing."""
+    pairings = []
+    for i in range(len(specs)):
+        for j in range(i + 1, len(specs)):
+            for k in range(games):
+                pairings.append((specs[i], specs[j]) if k % 2 == 0 else (specs[j], specs[i]))
+    return pairings
+
+def gauntlet(specs, games=GAMES_PER_PAIR):
+    """Returns the (p1 spec, p2 spec, candidate_is_p1) games of specs[0] against every other spec, alternating colours.
+    The colour flag tells the candidate apart even when it plays a copy of itself."""
+    pairings = []
+    for opponent in specs[1:]:
+        for k in range(games):
+            pairings.append((specs[0], opponent, True) if k % 2 == 0 else (opponent, specs[0], False))
+    return pairings
+
+def play_game(job):
+    """Plays one game in a worker process and returns its result record."""
+    index, p1_spec, p2_spec, candidate_is_p1, seed, timeout, max_turns = job
+    random.seed(seed)
+    np.random.seed(seed % (1 << 32))
+    start = time.perf_counter()
+    winner, game_str, turns = play_match(make_agent(p1_spec, PLAYER1), make_agent(p2_spec, PLAYER2), timeout, max_turns)
+    record = {'game': index, 'p1': p1_spec, 'p2': p2_spec, 'winner': int(winner), 'turns': turns,
+              'seconds': round(time.perf_counter() - start, 3), 'seed': seed, 'game_str': game_str}
+    if candidate_is_p1 is not None:
+        record['candidate_is_p1'] = candidate_is_p1
+    return record
+
+def play_games(pairings, workers=None, seed=None, timeout=TIMEOUT, max_turns=MAX_TURNS, path=None):
+    """Plays the (p1, p2) or gauntlet (p1, p2, candidate_is_p1) games across a pool of worker processes and yields
+    their records as they finish. Records are appended to path (if given) as they arrive; closing the generator stops the pool."""
+    rng = random.Random(seed)
+    jobs = [(i, p1, p2, colour[0] if colour else None, rng.getrandbits(63), timeout, max_turns)
+            for i, (p1, p2, *colour) in enumerate(pairings)]
+    out = open(path, 'a') if path is not None else None
+    pool = Pool(workers, maxtasksperchild=1)  # a fresh process per game, so no agent state leaks between games
+    try:
+        for record in pool.imap_unordered(play_game, jobs):
+            if out is not None:
+                out.write(json.dumps(record) + '\n')
+                out.flush()
+            yield record
+    finally:
+        pool.terminate()
+        pool.join()
+        if out is not None:
+            out.close()
+
+def score_of(record, spec):
+    """Returns spec's score in a game record: 1 for a win, 0.5 for a draw, 0 for a loss."""
+    if record['winner'] == EMPTY:
+        return 0.5
+    return 1.0 if (record['winner'] == PLAYER1) == (record['p1'] == spec) else 0.0
+
+def candidate_score(record):
+    """Returns the gauntlet candidate's score in a game record, from the colour it played."""
+    if record['winner'] == EMPTY:
+        return 0.5
+    return 1.0 if record['winner'] == (PLAYER1 if record['candidate_is_p1'] else PLAYER2) else 0.0
+
+def elo_from_score(score):
+    """Returns the Elo difference that gives an expected score."""
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+def score_from_elo(elo):
+    """Returns the expected score of a player elo points stronger than its opponent."""
+    return 1 / (1 + 10 ** (-elo / 400))
+
+class Standings:
+    def __init__(self, specs):
+        self.specs = list(specs)
+        self.results = {}   # (spec, opponent) -> [wins, losses, draws] of spec
+
+    def add(self, record):
+        """Counts a game record."""
+        p1, p2 = record['p1'], record['p2']
+        for spec, opponent in ((p1, p2), (p2, p1)):
+            counts = self.results.setdefault((spec, opponent), [0, 0, 0])
+            score = score_of(record, spec)
+            counts[0 if score == 1 else 1 if score == 0 else 2] += 1
+
+    def totals(self, spec):
+        """Returns spec's [wins, losses, draws] over all its games."""
+        totals = [0, 0, 0]
+        for (player, _), counts in self.results.items():
+            if player == spec:
+                totals = [a + b for a, b in zip(totals, counts)]
+        return totals
+
+    def ratings(self, iterations=1000):
+        """Returns {spec: Elo} by Bradley-Terry maximum likelihood (a draw is half a win), centred on 0."""
+        gamma = {spec: 1.0 for spec in self.specs}
+        for _ in range(iterations):
+            updated = {}
+            for spec in self.specs:
+                points = 0.0
+                denominator = 0.0
+                for opponent in self.specs:
+                    wins, losses, draws = self.results.get((spec, opponent), (0, 0, 0))
+                    games = wins + losses + draws
+                    if opponent == spec or games == 0:
+                        continue
+                    points += wins + 0.5 * draws + 0.5 * VIRTUAL_DRAWS
+                    denominator += (games + VIRTUAL_DRAWS) / (gamma[spec] + gamma[opponent])
+                updated[spec] = points / denominator if denominator else gamma[spec]
+            # keep the geometric mean at 1 so the ratings are centred on 0
+            mean = math.exp(sum(math.log(g) for g in updated.values()) / len(updated))
+            gamma = {spec: g / mean for spec, g in updated.items()}
+        return {spec: 400 * math.log10(g) for spec, g in gamma.items()}
+
+    def margin(self, spec, ratings=None):
+        """Returns the half-width of the 95% interval of spec's Elo, from the Fisher information of the Bradley-Terry fit."""
+        ratings = ratings if ratings is not None else self.ratings()
+        information = 0.0
+        for opponent in self.specs:
+            wins, losses, draws = self.results.get((spec, opponent), (0, 0, 0))
+            games = wins + losses + draws
+            if opponent == spec or games == 0:
+                continue
+            # the same virtual draws as ratings, so an agent that won or lost every game still gets a finite interval
+            p = 1 / (1 + 10 ** ((ratings[opponent] - ratings[spec]) / 400))
+            information += (games + VIRTUAL_DRAWS) * p * (1 - p)
+        if information == 0:
+            return float('inf')  # no games played
+        return Z_95 * 400 / math.log(10) / math.sqrt(information)
+
+    def table(self):
+        """Returns the standings and the crosstable of wins-losses-draws as text."""
+        ratings = self.ratings()
+        order = sorted(self.specs, key=lambda spec: -ratings[spec])
+        width = max(len(spec) for spec in order)
+        lines = [f"{'#':>2}  {'agent':<{width}}  {'elo':>6}  {'+/-':>5}  {'games':>5}  {'W-L-D':>11}  {'score':>6}"]
+        for rank, spec in enumerate(order, 1):
+            wins, losses, draws = self.totals(spec)
+            games = wins + losses + draws
+            score = (wins + 0.5 * draws) / games if games else 0.0
+            lines.append(f"{rank:>2}  {spec:<{width}}  {ratings[spec]:>6.0f}  {self.margin(spec, ratings):>5.0f}  {games:>5}  "
+                         f"{f'{wins}-{losses}-{draws}':>11}  {100 * score:>5.1f}%")
+        lines.append('')
+        lines.append(' ' * (width + 4) + '  '.join(f"{rank:>9}" for rank in range(1, len(order) + 1)))
+        for rank, spec in enumerate(order, 1):
+            cells = []
+            for opponent in order:
+                counts = self.results.get((spec, opponent))
+                cells.append(f"{'-'.join(map(str, counts)):>9}" if counts else f"{'.':>9}")
+            lines.append(f"{rank:>2}  {spec:<{width}}" + '  '.join(cells))
+        return '\n'.join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Plays a tournament between agent specs.")
+    parser.add_argument('agents', nargs='+', help='agent specs, e.g. "HybridAgent2(depth=32, time_limit=0.5)"')
+    parser.add_argument('--games', type=int, default=GAMES_PER_PAIR, help='games per pairing')
+    parser.add_argument('--gauntlet', action='store_true', help='play the first agent against the others only')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per core)')
+    parser.add_argument('--timeout', type=float, default=TIMEOUT, help='seconds per move')
+    parser.add_argument('--max-turns', type=int, default=MAX_TURNS, help='turns before a draw is called')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--out', default=RESULTS_PATH, help='JSON lines file the results are appended to')
+    args = parser.parse_args()
+
+    for spec in args.agents:
+        parse_spec(spec)  # fail before starting any worker
+    pairings = (gauntlet if args.gauntlet else round_robin)(args.agents, args.games)
+    standings = Standings(args.agents)
+    start = time.perf_counter()
+    for done, record in enumerate(play_games(pairings, args.workers, args.seed, args.timeout, args.max_turns, args.out), 1):
+        standings.add(record)
+        print(f"[{done}/{len(pairings)}] {record['p1']} vs {record['p2']}: winner {record['winner']} in {record['turns']} turns")
+    print(f"\n{len(pairings)} games in {time.perf_counter() - start:.1f}s\n")
+    print(standings.table())
+
+if __name__ == '__main__':
+    main()
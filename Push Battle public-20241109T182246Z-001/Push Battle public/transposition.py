@@ -0,0 +1,73 @@
+from array import array
+from movegen import NO_MOVE
+
+'''
+Fixed-size transposition table shared by the search agents.
+Positions are keyed by Game.zobrist_key. Every bucket holds two entries: slot 0 keeps the deepest search
+(it is only replaced by a search at least as deep, or once it is left over from an earlier move), slot 1 is always replaced.
+Entries live in flat typed arrays so the memory used is fixed when the table is created.
+'''
+
+EXACT = 0       # value is the exact minimax value
+LOWER = 1       # value is a lower bound (the search failed high)
+UPPER = 2       # value is an upper bound (the search failed low)
+
+ENTRY_BYTES = 8 + 8 + 1 + 1 + 2 + 1     # key, value, depth, flag, move, generation
+
+class TranspositionTable:
+    def __init__(self, max_mb=64):
+        # the largest power of two number of buckets (2 entries each) that fits in max_mb
+        buckets = 1
+        while buckets * 4 * ENTRY_BYTES <= max_mb * 1024 * 1024:
+            buckets *= 2
+        self.num_buckets = buckets
+        self.mask = buckets - 1
+        size = buckets * 2
+        self.keys = array('Q', bytes(8 * size))
+        self.values = array('d', bytes(8 * size))
+        self.depths = array('b', [-1]) * size       # -1 marks an empty entry
+        self.flags = array('b', bytes(size))
+        self.moves = array('h', [NO_MOVE]) * size
+        self.generations = array('B', bytes(size))
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+
+    def memory_bytes(self):
+        """Returns the number of bytes held by the table."""
+        return len(self.keys) * ENTRY_BYTES
+
+    def new_search(self):
+        """Marks every current entry as coming from an earlier search so it can be replaced first."""
+        self.generation = (self.generation + 1) & 0xFF
+
+    def clear(self):
+        """Empties the table."""
+        size = len(self.keys)
+        self.depths = array('b', [-1]) * size
+        self.moves = array('h', [NO_MOVE]) * size
+
+    def probe(self, key):
+        """Returns (depth, flag, value, move) stored for key, or None."""
+        self.probes += 1
+        i = (key & self.mask) << 1
+        if self.keys[i] != key or self.depths[i] < 0:
+            i += 1
+            if self.keys[i] != key or self.depths[i] < 0:
+                return None
+        self.hits += 1
+        return self.depths[i], self.flags[i], self.values[i], self.moves[i]
+
+    def store(self, key, depth, flag, value, move=NO_MOVE):
+        """Stores a search result for key using the depth-preferred / always-replace buckets."""
+        i = (key & self.mask) << 1
+        if self.depths[i] >= 0 and self.generations[i] == self.generation and depth < self.depths[i]:
+            i += 1
+        if move == NO_MOVE and self.keys[i] == key:
+            move = self.moves[i]    # keep the best move of an earlier search of the same position
+        self.keys[i] = key
+        self.values[i] = value
+        self.depths[i] = depth
+        self.flags[i] = flag
+        self.moves[i] = move
+        self.generations[i] = self.generation